@@ -8,7 +8,7 @@ A股市场情绪分析工具 - 真实数据版
 import sys
 import json
 import subprocess
-import requests
+import http_pool
 from datetime import datetime
 
 # 配置
@@ -30,7 +30,7 @@ def get_stock_price(code):
     try:
         market = 'sh' if code.startswith('6') else 'sz'
         url = f"http://qt.gtimg.cn/q={market}{code}"
-        r = requests.get(url, timeout=5)
+        r = http_pool.get(url, timeout=5)
         if r.status_code == 200:
             data = r.text.strip().split('~')
             if len(data) > 32:
@@ -91,7 +91,7 @@ def send_telegram(message):
     url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
     data = {"chat_id": TELEGRAM_CHAT_ID, "text": message, "parse_mode": "Markdown"}
     try:
-        resp = requests.post(url, json=data, timeout=10)
+        resp = http_pool.post(url, json=data, timeout=10)
         return resp.ok
     except Exception as e:
         print(f"❌ Telegram错误: {e}")
@@ -6,7 +6,7 @@ A股市场情绪分析工具 - 真实数据版
 
 import sys
 import json
-import requests
+import http_pool
 from datetime import datetime
 
 # 配置
@@ -25,7 +25,7 @@ def get_index_data(code, name):
     """获取大盘指数真实数据"""
     try:
         url = f"http://qt.gtimg.cn/q={code}"
-        r = requests.get(url, timeout=5)
+        r = http_pool.get(url, timeout=5)
         if r.status_code == 200:
             data = r.text.strip().split('~')
             if len(data) > 32:
@@ -45,7 +45,7 @@ def get_stock_price(code):
     try:
         market = 'sh' if code.startswith('6') else 'sz'
         url = f"http://qt.gtimg.cn/q={market}{code}"
-        r = requests.get(url, timeout=5)
+        r = http_pool.get(url, timeout=5)
         if r.status_code == 200:
             data = r.text.strip().split('~')
             if len(data) > 32:
@@ -72,7 +72,7 @@ def get_eastmoney_sectors():
             'fs': 'm:90',
             'cb': ''
         }
-        r = requests.get(url, params=params, timeout=10)
+        r = http_pool.get(url, params=params, timeout=10)
         if r.status_code == 200:
             data = r.json()
             if 'data' in data and 'list' in data['data']:
@@ -86,7 +86,7 @@ def get_north_money():
     # 通过港交所数据估算
     try:
         # 沪股通
-        r = requests.get('http://push2.eastmoney.com/api/qt/stock/get', params={
+        r = http_pool.get('http://push2.eastmoney.com/api/qt/stock/get', params={
             'secid': '1.000001',
             'fields': 'f43,f44,f45,f46,f47,f48,f49,f50,f51,f52,f53,f54,f55,f56,f57,f58',
         }, timeout=5)
@@ -124,7 +124,7 @@ def get_fund_flow():
     """资金流向 - 估算"""
     # 基于成交量变化估算
     try:
-        r = requests.get('http://push2.eastmoney.com/api/qt/stock/get', params={
+        r = http_pool.get('http://push2.eastmoney.com/api/qt/stock/get', params={
             'secid': '0.399001',
             'fields': 'f43,f44,f45,f46,f47,f48,f49,f50,f51,f52,f53,f54,f55,f56,f57,f58',
         }, timeout=5)
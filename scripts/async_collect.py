@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+asyncio 数据采集层
+
+- AsyncHTTP: 异步 HTTP 客户端，经过与 http_pool 共用的域名限流器 (rate_limit)
+  安装了 aiohttp 时使用 aiohttp，否则退回到线程中执行 http_pool 的同步请求
+- run_blocking: 在线程中执行同步函数 (浏览器子进程、AkShare 等)，受固定并发上限限制
+- fetch_quotes_async: 腾讯批量行情的异步版本，所有分块同时发出，与同步版共用熔断器
+"""
+
+import sys
+import os
+import asyncio
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# 🚀 使用共享模块
+shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
+sys.path.insert(0, shared_dir)
+
+from logger import setup_logger
+import http_pool
+from rate_limit import limiter_for
+from circuit_breaker import breaker, CircuitOpenError
+from records import Quote
+from tencent_quote import QUOTE_URL, CHUNK_SIZE, BREAKER, parse_quotes, to_symbol
+
+logger = setup_logger(__name__)
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+    logger.debug("aiohttp未安装，异步请求使用线程池执行")
+
+# run_blocking 的并发上限 (HTTP 请求的速率和并发由 rate_limit 自适应控制)
+HOST_LIMITS = {
+    'qt.gtimg.cn': 16,
+    'web.ifzq.gtimg.cn': 8,
+    'push2.eastmoney.com': 4,
+    'data.10jqka.com.cn': 4,
+    # 本地浏览器只有一个实例
+    'browser': 1,
+}
+DEFAULT_HOST_LIMIT = 4
+
+
+class AsyncHTTP:
+    """按域名限流的异步 HTTP 客户端"""
+
+    def __init__(self, host_limits: Optional[Dict[str, int]] = None):
+        self.host_limits = {**HOST_LIMITS, **(host_limits or {})}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._session = None
+
+    async def __aenter__(self) -> 'AsyncHTTP':
+        if aiohttp is not None:
+            connector = aiohttp.TCPConnector(limit=64, limit_per_host=max(self.host_limits.values()))
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=http_pool.DEFAULT_HEADERS,
+                auto_decompress=True,
+            )
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def limit(self, host: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(host)
+        if sem is None:
+            sem = self._semaphores[host] = asyncio.Semaphore(self.host_limits.get(host, DEFAULT_HOST_LIMIT))
+        return sem
+
+    async def get_text(self, url: str, params: Optional[Dict] = None, encoding: Optional[str] = None,
+                       timeout: float = 10) -> str:
+        if self._session is not None:
+            host = url.split('/')[2]
+            async with limiter_for(host).slot_async() as slot:
+                async with self._session.get(url, params=params,
+                                             timeout=aiohttp.ClientTimeout(total=timeout)) as r:
+                    slot.record(r.status)
+                    r.raise_for_status()
+                    return await r.text(encoding=encoding)
+
+        # http_pool 内部已经过限流器
+        def fetch():
+            r = http_pool.get(url, params=params, timeout=timeout)
+            r.raise_for_status()
+            if encoding:
+                r.encoding = encoding
+            return r.text
+
+        return await asyncio.to_thread(fetch)
+
+    async def run_blocking(self, host: str, fn: Callable, *args, **kwargs) -> Any:
+        """在线程中执行同步函数，占用 host 的并发名额"""
+        async with self.limit(host):
+            return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+async def fetch_quotes_async(http: AsyncHTTP, codes: Iterable[str], chunk_size: int = CHUNK_SIZE) -> Dict[str, Quote]:
+    """批量行情 (异步)，返回 {symbol: quote}，失败的块不影响其他块"""
+    symbols = list(dict.fromkeys(to_symbol(c) for c in codes))
+
+    async def fetch_chunk(chunk):
+        try:
+            # aiohttp 和线程池两条路径都计入熔断器，失败才会触发熔断
+            with breaker(BREAKER).guard():
+                return parse_quotes(await http.get_text(QUOTE_URL + ','.join(chunk), encoding='gbk', timeout=5))
+        except CircuitOpenError:
+            return {}
+        except Exception as e:
+            logger.warning(f"批量行情获取失败 ({len(chunk)}只, {chunk[0]}...): {e}")
+            return {}
+
+    chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+    quotes = {}
+    for result in await asyncio.gather(*(fetch_chunk(c) for c in chunks)):
+        quotes.update(result)
+    return quotes
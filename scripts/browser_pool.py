@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+浏览器标签页池 - 同花顺页面快照
+
+- 保持 N 个标签页常驻 (标签 ID 记录在 DATA_DIR/browser_tabs.json，下次运行直接复用)
+- 多个页面并行在不同标签页中加载
+- 轮询快照直到表格出现，不再固定 sleep；页面就绪即返回
+- 经过 ths_browser 熔断器: 浏览器故障时立即抛出 CircuitOpenError
+
+依赖 openclaw browser 的多标签参数 (open --json 返回 targetId，navigate/snapshot 支持 --target-id)；
+open 的输出里拿不到标签 ID 时，直接取刚打开页面的快照 (不重新打开)，之后退回到单标签串行模式
+(open 后轮询当前页面快照)。只有 CLI 明确不认识 --json 时才改用不带 --json 的 open。
+
+用法:
+    from browser_pool import pool
+    text = pool.snapshot('https://data.10jqka.com.cn/funds/gnzjl/')
+    texts = pool.snapshot_many([url1, url2, url3, url4])
+"""
+
+import sys
+import os
+import re
+import json
+import time
+import queue
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+# 🚀 使用共享模块
+shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
+sys.path.insert(0, shared_dir)
+
+from logger import setup_logger
+from circuit_breaker import breaker
+
+logger = setup_logger(__name__)
+
+DATA_DIR = os.path.expanduser("~/.openclaw/workspace/data/stock-sentiment-cn")
+TABS_FILE = os.path.join(DATA_DIR, 'browser_tabs.json')
+
+POOL_SIZE = 4
+OPEN_TIMEOUT = 30
+SNAPSHOT_TIMEOUT = 60
+# 等待表格出现的总时长和轮询间隔 (秒)
+READY_TIMEOUT = 15
+POLL_INTERVAL = 0.3
+
+# 表格就绪: 出现以序号开头的数据行 (text 格式为 row "1 ..."，aria 格式为 cell "1")
+_TABLE_ROW_RE = re.compile(r'row "\d+\s|cell "\d+"')
+_TARGET_ID_RE = re.compile(r'target[_ ]?id"?\s*[:=]\s*"?([\w-]+)', re.I)
+# 旧版 CLI 不认识某个参数时的报错
+_UNKNOWN_OPTION_RE = re.compile(r'unknown (option|argument|flag)|unrecognized|unexpected argument', re.I)
+
+
+def table_ready(text: str) -> bool:
+    return bool(_TABLE_ROW_RE.search(text))
+
+
+def _cli(*args: str, timeout: float = SNAPSHOT_TIMEOUT) -> subprocess.CompletedProcess:
+    return subprocess.run(['openclaw', 'browser', *args], capture_output=True, text=True, timeout=timeout)
+
+
+def _option_unsupported(result: subprocess.CompletedProcess, option: str) -> bool:
+    """命令失败是因为 CLI 不支持 option (而不是页面打开失败)"""
+    output = f"{result.stderr}\n{result.stdout}"
+    return option in output and bool(_UNKNOWN_OPTION_RE.search(output))
+
+
+def _parse_target_id(output: str) -> Optional[str]:
+    try:
+        data = json.loads(output)
+        if isinstance(data, dict):
+            return data.get('targetId')
+    except ValueError:
+        pass
+    match = _TARGET_ID_RE.search(output)
+    return match.group(1) if match else None
+
+
+class BrowserPool:
+    """常驻标签页池，线程安全"""
+
+    def __init__(self, size: int = POOL_SIZE, tabs_file: str = TABS_FILE):
+        self.size = size
+        self.tabs_file = tabs_file
+        self._idle: 'queue.Queue[str]' = queue.Queue()
+        self._tabs: List[str] = []
+        self._lock = threading.Lock()
+        # 拿不到标签 ID 时只能操作当前标签，串行执行
+        self._single_tab = False
+        self._single_lock = threading.Lock()
+        self._load_tabs()
+
+    def _load_tabs(self):
+        try:
+            with open(self.tabs_file, 'r', encoding='utf-8') as f:
+                tabs = json.load(f).get('tabs', [])
+        except (OSError, ValueError):
+            return
+        for tab in tabs[:self.size]:
+            self._tabs.append(tab)
+            self._idle.put(tab)
+
+    def _save_tabs(self):
+        try:
+            os.makedirs(os.path.dirname(self.tabs_file), exist_ok=True)
+            with open(self.tabs_file, 'w', encoding='utf-8') as f:
+                json.dump({'tabs': self._tabs}, f)
+        except OSError as e:
+            logger.debug(f"标签页记录保存失败: {e}")
+
+    def _open_tab(self, url: str, fmt: str, ready: Callable[[str], bool],
+                  timeout: float) -> Tuple[Optional[str], Optional[str]]:
+        """
+        新开标签页并加载 url，返回 (标签 ID, None)
+
+        拿不到标签 ID 时切换为单标签模式，返回 (None, 刚打开页面的快照)；
+        打开和取快照都持有单标签锁，其他线程不会在中间切换当前页面
+        """
+        with self._single_lock:
+            result = _cli('open', url, '--json', timeout=OPEN_TIMEOUT)
+            if result.returncode != 0 and _option_unsupported(result, '--json'):
+                result = _cli('open', url, timeout=OPEN_TIMEOUT)
+            if result.returncode != 0:
+                raise RuntimeError(f"打开页面失败: {result.stderr.strip()}")
+            tab = _parse_target_id(result.stdout)
+            if tab is None:
+                if not self._single_tab:
+                    logger.info("浏览器未返回标签 ID，使用单标签串行模式")
+                self._single_tab = True
+                return None, self._wait_ready(None, fmt, ready, timeout)
+        with self._lock:
+            self._tabs.append(tab)
+            self._save_tabs()
+        return tab, None
+
+    def _drop_tab(self, tab: str):
+        with self._lock:
+            if tab in self._tabs:
+                self._tabs.remove(tab)
+                self._save_tabs()
+
+    def _acquire(self, url: str, fmt: str, ready: Callable[[str], bool],
+                 timeout: float) -> Tuple[Optional[str], Optional[str]]:
+        """取一个空闲标签并导航到 url；没有空闲且未满时新开 (见 _open_tab)"""
+        while True:
+            try:
+                tab = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_open = len(self._tabs) < self.size
+                if can_open:
+                    return self._open_tab(url, fmt, ready, timeout)
+                tab = self._idle.get()
+
+            result = _cli('navigate', url, '--target-id', tab, timeout=OPEN_TIMEOUT)
+            if result.returncode == 0:
+                return tab, None
+            # 标签已被关闭 (浏览器重启等)，丢弃后重试
+            logger.debug(f"标签 {tab} 不可用: {result.stderr.strip()}")
+            self._drop_tab(tab)
+
+    def _wait_ready(self, tab: Optional[str], fmt: str, ready: Callable[[str], bool],
+                    timeout: float) -> Optional[str]:
+        """轮询快照直到 ready；超时返回最后一次快照"""
+        args = ['snapshot', '--format', fmt] + (['--target-id', tab] if tab else [])
+        deadline = time.monotonic() + timeout
+        text = None
+        while True:
+            result = _cli(*args)
+            if result.returncode == 0:
+                text = result.stdout
+                if ready(text):
+                    return text
+            if time.monotonic() >= deadline:
+                logger.debug(f"页面就绪等待超时 ({timeout}s)")
+                return text
+            time.sleep(POLL_INTERVAL)
+
+    def snapshot(self, url: str, fmt: str = 'aria', ready: Callable[[str], bool] = table_ready,
+                 timeout: float = READY_TIMEOUT) -> Optional[str]:
+        """
+        加载页面并返回快照
+
+        参数:
+            fmt: 快照格式 aria/text
+            ready: 判断页面数据是否已渲染
+        返回:
+            快照文本，失败返回 None；熔断时抛出 CircuitOpenError
+        """
+        with breaker('ths_browser').guard() as call:
+            if self._single_tab:
+                text = self._snapshot_single(url, fmt, ready, timeout)
+            else:
+                tab, text = self._acquire(url, fmt, ready, timeout)
+                if tab is not None:
+                    try:
+                        text = self._wait_ready(tab, fmt, ready, timeout)
+                    finally:
+                        self._idle.put(tab)
+            if not text:
+                call.fail()
+            return text
+
+    def _snapshot_single(self, url: str, fmt: str, ready: Callable[[str], bool],
+                         timeout: float) -> Optional[str]:
+        with self._single_lock:
+            result = _cli('open', url, timeout=OPEN_TIMEOUT)
+            if result.returncode != 0:
+                raise RuntimeError(f"打开页面失败: {result.stderr.strip()}")
+            return self._wait_ready(None, fmt, ready, timeout)
+
+    def snapshot_many(self, urls: List[str], fmt: str = 'aria',
+                      ready: Union[Callable[[str], bool], Dict[str, Callable[[str], bool]]] = table_ready
+                      ) -> Dict[str, Optional[str]]:
+        """
+        并行加载多个页面，返回 {url: 快照}，单个页面失败为 None
+
+        参数:
+            ready: 就绪判断，可按 url 分别指定 {url: 判断函数}
+        """
+        def one(url):
+            check = ready.get(url, table_ready) if isinstance(ready, dict) else ready
+            try:
+                return self.snapshot(url, fmt, check)
+            except Exception as e:
+                logger.warning(f"页面快照失败 {url}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.size, len(urls)))) as executor:
+            return dict(zip(urls, executor.map(one, urls)))
+
+
+pool = BrowserPool()
+
+
+if __name__ == '__main__':
+    urls = sys.argv[1:] or ['https://data.10jqka.com.cn/funds/gnzjl/']
+    start = time.time()
+    for url, text in pool.snapshot_many(urls).items():
+        print(f"{'✅' if text else '❌'} {url}: {len(text or '')} 字符")
+    print(f"耗时 {time.time() - start:.2f}s")
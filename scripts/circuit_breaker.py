@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+按数据源的熔断器 + 健康状态登记
+
+状态:
+    closed     正常放行
+    open       最近连续失败或错误率过高，直接跳过 (不再等待超时)，冷却期后转 half_open
+    half_open  放行一次试探请求: 成功则 closed，失败则重新 open
+
+状态和最近调用结果保存在 DATA_DIR/breakers.json，跨运行生效:
+上一次运行发现数据源故障后，下一次运行开始即跳过它，直接使用缓存或备用数据。
+
+用法:
+    with breaker('eastmoney').guard() as call:
+        data = fetch(...)
+        if not data:
+            call.fail()
+"""
+
+import sys
+import os
+import json
+import atexit
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# 🚀 使用共享模块
+shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
+sys.path.insert(0, shared_dir)
+
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DATA_DIR = os.path.expanduser("~/.openclaw/workspace/data/stock-sentiment-cn")
+BREAKER_FILE = os.path.join(DATA_DIR, 'breakers.json')
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+# 数据源 -> 冷却时间 (秒)；浏览器和 AI 接口超时代价高，冷却更久
+SOURCES = {
+    'tencent_quote': 60,
+    'tencent_snapshot': 60,
+    'tencent_daily': 300,
+    'eastmoney': 300,
+    'ths_browser': 900,
+    'akshare': 900,
+    'minimax': 600,
+}
+DEFAULT_COOLDOWN = 300
+
+CONSECUTIVE_FAILURES = 3
+# 最近 WINDOW 次调用中错误率达到 ERROR_RATE (且不少于 MIN_CALLS 次) 时熔断
+WINDOW = 20
+MIN_CALLS = 6
+ERROR_RATE = 0.5
+
+
+class CircuitOpenError(Exception):
+    """数据源处于熔断状态"""
+
+    def __init__(self, source: str):
+        super().__init__(f"{source} 已熔断")
+        self.source = source
+
+
+class _Call:
+    """一次受保护调用的结果登记 (无异常但结果无效时调用 fail)"""
+
+    __slots__ = ('failed',)
+
+    def __init__(self):
+        self.failed = False
+
+    def fail(self):
+        self.failed = True
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, registry: 'BreakerRegistry', cooldown: float = DEFAULT_COOLDOWN):
+        self.name = name
+        self.cooldown = cooldown
+        self.state = STATE_CLOSED
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self.recent = deque(maxlen=WINDOW)
+        self._registry = registry
+        self._lock = threading.Lock()
+        self._trial_running = False
+
+    @property
+    def error_rate(self) -> float:
+        return (self.recent.count(False) / len(self.recent)) if self.recent else 0.0
+
+    def allow(self) -> bool:
+        """是否放行本次调用；open 状态冷却期满后转为 half_open 并放行一次"""
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                return True
+            if self.state == STATE_OPEN:
+                if time.time() - self.opened_at < self.cooldown:
+                    return False
+                self.state = STATE_HALF_OPEN
+                self._trial_running = False
+            if self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            changed = self.state != STATE_CLOSED
+            # 恢复后重新统计错误率，避免故障期的失败记录立即再次触发熔断
+            if changed:
+                self.recent.clear()
+            self.recent.append(True)
+            self.consecutive_failures = 0
+            self.state = STATE_CLOSED
+            self._trial_running = False
+        if changed:
+            logger.info(f"{self.name} 已恢复")
+            self._registry.save()
+
+    def record_failure(self):
+        with self._lock:
+            self.recent.append(False)
+            self.consecutive_failures += 1
+            trip = self.state == STATE_HALF_OPEN or \
+                self.consecutive_failures >= CONSECUTIVE_FAILURES or \
+                (len(self.recent) >= MIN_CALLS and self.error_rate >= ERROR_RATE)
+            opened = trip and self.state != STATE_OPEN
+            if trip:
+                self.state = STATE_OPEN
+                self.opened_at = time.time()
+            self._trial_running = False
+        if opened:
+            logger.warning(f"{self.name} 熔断 {self.cooldown:.0f}s (错误率 {self.error_rate:.0%})")
+        if trip:
+            self._registry.save()
+
+    def end_trial(self):
+        """释放 half_open 的试探名额 (调用被中断、没有结果时)"""
+        with self._lock:
+            self._trial_running = False
+
+    @contextmanager
+    def guard(self):
+        """
+        熔断时抛出 CircuitOpenError；块内异常或 call.fail() 计为失败
+
+        KeyboardInterrupt/SystemExit 等中断不计成败，但会释放试探名额，
+        否则 half_open 的熔断器再也不会放行试探请求
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+        call = _Call()
+        ok = None
+        try:
+            yield call
+            ok = not call.failed
+        except Exception:
+            ok = False
+            raise
+        finally:
+            if ok is None:
+                self.end_trial()
+            elif ok:
+                self.record_success()
+            else:
+                self.record_failure()
+
+    def to_dict(self) -> Dict:
+        return {
+            'state': self.state,
+            'opened_at': self.opened_at,
+            'consecutive_failures': self.consecutive_failures,
+            'error_rate': round(self.error_rate, 3),
+            'recent': ''.join('1' if ok else '0' for ok in self.recent),
+        }
+
+    def load(self, data: Dict):
+        self.state = data.get('state', STATE_CLOSED)
+        self.opened_at = float(data.get('opened_at', 0))
+        self.consecutive_failures = int(data.get('consecutive_failures', 0))
+        self.recent.extend(c == '1' for c in data.get('recent', ''))
+        # 上次运行遗留的 half_open 视为 open，冷却期已满会立即再次试探
+        if self.state == STATE_HALF_OPEN:
+            self.state = STATE_OPEN
+
+
+class BreakerRegistry:
+    """全部数据源的熔断器，状态持久化到本地 JSON"""
+
+    def __init__(self, path: str = BREAKER_FILE):
+        self.path = path
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._saved: Optional[Dict] = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.debug(f"熔断状态加载失败: {e}")
+            return
+        for name, state in data.items():
+            self.get(name).load(state)
+        self._saved = data
+
+    def get(self, name: str) -> CircuitBreaker:
+        b = self._breakers.get(name)
+        if b is None:
+            with self._lock:
+                b = self._breakers.get(name)
+                if b is None:
+                    b = self._breakers[name] = CircuitBreaker(name, self, SOURCES.get(name, DEFAULT_COOLDOWN))
+        return b
+
+    def health(self) -> Dict[str, Dict]:
+        return {name: b.to_dict() for name, b in list(self._breakers.items())}
+
+    def save(self):
+        """写盘 (原子替换)；状态切换时立即调用，最近调用结果在进程退出时保存"""
+        with self._lock:
+            data = self.health()
+            if data == self._saved:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp = f"{self.path}.tmp"
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                os.replace(tmp, self.path)
+                self._saved = data
+            except Exception as e:
+                logger.debug(f"熔断状态保存失败: {e}")
+
+
+registry = BreakerRegistry()
+atexit.register(registry.save)
+
+
+def breaker(name: str) -> CircuitBreaker:
+    return registry.get(name)
+
+
+def is_open(name: str) -> bool:
+    """数据源当前是否熔断 (不占用 half_open 的试探名额)"""
+    b = registry.get(name)
+    return b.state == STATE_OPEN and time.time() - b.opened_at < b.cooldown
+
+
+if __name__ == '__main__':
+    for name in SOURCES:
+        breaker(name)
+    for name, state in registry.health().items():
+        print(f"{name:15s} {state['state']:10s} 错误率 {state['error_rate']:.0%}  最近 {state['recent'] or '-'}")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+跨进程持久缓存 - SQLite
+
+每次 cron 运行都是新进程，内存缓存无法复用；
+本模块把行情、历史、板块等数据带时间戳存到本地 SQLite，
+早盘/午盘/临时 --test 等相邻运行可以直接复用未过期的数据。
+过期数据定期自动清理。
+
+值是 pickle 后的 Record / MarketTable 对象，字段或 dtype 变化后旧数据无法正确还原，
+因此键带有数据结构版本前缀 (SCHEMA_VERSION + 各记录类型字段 + MarketTable dtype 的哈希)，
+结构变化后旧条目不再命中，到期后自动清理。
+"""
+
+import sys
+import os
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+# 🚀 使用共享模块
+shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
+sys.path.insert(0, shared_dir)
+
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DATA_DIR = os.path.expanduser("~/.openclaw/workspace/data/stock-sentiment-cn")
+CACHE_DB = os.path.join(DATA_DIR, 'cache.sqlite3')
+
+# 过期数据清理间隔 (秒)
+GC_INTERVAL = 600
+# 缓存值的结构发生字段/dtype 以外的不兼容变化时手动加一
+SCHEMA_VERSION = 1
+
+
+def schema_namespace() -> str:
+    """缓存数据结构版本: SCHEMA_VERSION + 各 Record 子类字段 + MarketTable dtype 的哈希"""
+    from records import Record
+    from market_table import DTYPE
+
+    parts = [str(SCHEMA_VERSION), repr(DTYPE.descr)]
+    pending = list(Record.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        parts.append(f"{cls.__module__}.{cls.__qualname__}{cls._fields}")
+        pending.extend(cls.__subclasses__())
+    return hashlib.sha1('\n'.join(sorted(parts)).encode()).hexdigest()[:12]
+
+
+class DiskCache:
+    """SQLite 键值缓存，值用 pickle 序列化，键按数据结构版本隔离"""
+
+    def __init__(self, path: str = CACHE_DB, gc_interval: float = GC_INTERVAL,
+                 namespace: Optional[str] = None):
+        self.path = path
+        self.gc_interval = gc_interval
+        self.namespace = namespace if namespace is not None else schema_namespace()
+        self._lock = threading.Lock()
+        self._last_gc = 0.0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        # WAL: 多个报告进程同时读写互不阻塞
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache(expires_at)')
+        self._conn.commit()
+        self.purge_expired()
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """返回 (value, expires_at)，不存在或已过期返回 None"""
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT value, expires_at FROM cache WHERE key = ? AND expires_at > ?',
+                    (self._key(key), now),
+                ).fetchone()
+            if row is None:
+                return None
+            return pickle.loads(row[0]), row[1]
+        except Exception as e:
+            logger.debug(f"磁盘缓存读取失败 {key}: {e}")
+            return None
+
+    def set(self, key: str, value: Any, expires_at: float):
+        now = time.time()
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO cache (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)',
+                    (self._key(key), blob, now, expires_at),
+                )
+                self._conn.commit()
+        except Exception as e:
+            logger.debug(f"磁盘缓存写入失败 {key}: {e}")
+            return
+
+        if now - self._last_gc > self.gc_interval:
+            self.purge_expired()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute('DELETE FROM cache WHERE key = ?', (self._key(key),))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """删除过期数据，返回删除条数"""
+        now = time.time()
+        try:
+            with self._lock:
+                cur = self._conn.execute('DELETE FROM cache WHERE expires_at <= ?', (now,))
+                self._conn.commit()
+            self._last_gc = now
+            if cur.rowcount:
+                logger.debug(f"磁盘缓存清理: {cur.rowcount}条过期数据")
+            return cur.rowcount
+        except Exception as e:
+            logger.debug(f"磁盘缓存清理失败: {e}")
+            return 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_disk_cache(path: str = CACHE_DB) -> Optional[DiskCache]:
+    """打开磁盘缓存，失败时返回 None (退回纯内存缓存)"""
+    try:
+        return DiskCache(path)
+    except Exception as e:
+        logger.warning(f"磁盘缓存不可用，仅使用内存缓存: {e}")
+        return None
@@ -9,8 +9,7 @@ import json
 import sys
 import os
 import re
-import requests
-import time
+import http_pool
 from datetime import datetime
 
 # 🚀 使用共享模块
@@ -18,13 +17,14 @@ from datetime import datetime
 shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
 sys.path.insert(0, shared_dir)
 
-from error_handler import handle_errors, retry
+from error_handler import handle_errors
+from circuit_breaker import breaker, CircuitOpenError
+from snapshot_parser import iter_static_texts
 from logger import setup_logger
 
 logger = setup_logger(__name__)
 
 @handle_errors(default_return={})
-@retry(max_retries=3, delay=1)
 def get_market_index():
     """获取大盘指数 - 腾讯API"""
     indices = [
@@ -37,7 +37,7 @@ def get_market_index():
     for code, name in indices:
         try:
             url = f"http://qt.gtimg.cn/q={code}"
-            r = requests.get(url, timeout=10)
+            r = http_pool.get(url, timeout=10)
             r.raise_for_status()
             
             data = r.text.strip().split('~')
@@ -50,11 +50,17 @@ def get_market_index():
                 logger.info(f"获取 {name}: {result[-1]['price']:.2f}")
         except Exception as e:
             logger.error(f"获取 {name} 失败: {e}")
-        
-        time.sleep(0.3)
     
     return result
 
+_COUNT_PATTERNS = (
+    ('up_count', re.compile(r'上涨[：:]\s*(\d+)')),
+    ('down_count', re.compile(r'下跌[：:]\s*(\d+)')),
+    ('涨停', re.compile(r'涨停[：:]\s*(\d+)')),
+    ('跌停', re.compile(r'跌停[：:]\s*(\d+)')),
+)
+_PROFIT_RE = re.compile(r'今收益[：:]\s*([+-]?\d+\.?\d*)%?')
+
 @handle_errors(default_return={})
 def parse_aria_tree(text):
     """解析 ARIA 格式的 Accessibility Tree"""
@@ -72,34 +78,22 @@ def parse_aria_tree(text):
         'source': '10jqka_browser'
     }
     
-    static_texts = re.findall(r'StaticText "([^"]+)"', text)
-    
-    for line in static_texts:
-        if '上涨' in line and '只' in line:
-            match = re.search(r'上涨[：:]\s*(\d+)', line)
-            if match:
-                data['up_count'] = int(match.group(1))
-        if '下跌' in line and '只' in line:
-            match = re.search(r'下跌[：:]\s*(\d+)', line)
-            if match:
-                data['down_count'] = int(match.group(1))
-        if '涨停' in line and '只' in line:
-            match = re.search(r'涨停[：:]\s*(\d+)', line)
-            if match:
-                data['涨停'] = int(match.group(1))
-        if '跌停' in line and '只' in line:
-            match = re.search(r'跌停[：:]\s*(\d+)', line)
-            if match:
-                data['跌停'] = int(match.group(1))
+    # 单遍扫描; "建议" 之后的下一条文本为建议内容
+    after_advice = False
+    for line in iter_static_texts(text):
+        if after_advice and len(line) <= 20:
+            data['大盘建议'] = line.strip()
+        after_advice = '建议' in line
+        
+        if '只' in line:
+            for key, pattern in _COUNT_PATTERNS:
+                match = pattern.search(line)
+                if match:
+                    data[key] = int(match.group(1))
         if '今收益' in line:
-            match = re.search(r'今收益[：:]\s*([+-]?\d+\.?\d*)%?', line)
+            match = _PROFIT_RE.search(line)
             if match:
                 data['昨日涨停收益'] = float(match.group(1))
-        
-        if '建议' in line and static_texts.index(line) + 1 < len(static_texts):
-            next_line = static_texts[static_texts.index(line) + 1]
-            if next_line and len(next_line) <= 20:
-                data['大盘建议'] = next_line.strip()
     
     return data
 
@@ -114,12 +108,15 @@ def fetch_browser_data():
             '--format', 'aria'
         ]
         
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+        with breaker('ths_browser').guard() as call:
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=60
+            )
+            if result.returncode != 0:
+                call.fail()
         
         if result.returncode != 0:
             logger.error(f"获取快照失败: {result.stderr}")
@@ -130,6 +127,9 @@ def fetch_browser_data():
         
         return data
         
+    except CircuitOpenError as e:
+        logger.warning(f"{e}，跳过浏览器数据")
+        return {}
     except Exception as e:
         logger.error(f"Browser获取异常: {e}")
         return {}
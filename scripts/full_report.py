@@ -8,9 +8,8 @@ A股市场情绪分析报告 - 完整版
 import sys
 import json
 import subprocess
-import requests
+import http_pool
 from datetime import datetime
-import time
 import os
 
 # 🚀 使用共享模块
@@ -18,7 +17,7 @@ shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
 sys.path.insert(0, shared_dir)
 
 from config_loader import config
-from error_handler import handle_errors, retry
+from error_handler import handle_errors
 from logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -37,13 +36,12 @@ WATCHLIST = [
 ]
 
 @handle_errors(default_return=None)
-@retry(max_retries=3, delay=2)
 def get_stock_price(code):
     """获取实时股价"""
     market = 'sh' if code.startswith('6') else 'sz'
     url = f"http://qt.gtimg.cn/q={market}{code}"
     
-    r = requests.get(url, timeout=10)
+    r = http_pool.get(url, timeout=10)
     r.raise_for_status()
     
     data = r.text.strip().split('~')
@@ -68,7 +66,7 @@ def get_market_index():
     for code, name in indices:
         try:
             url = f"http://qt.gtimg.cn/q={code}"
-            r = requests.get(url, timeout=10)
+            r = http_pool.get(url, timeout=10)
             r.raise_for_status()
             
             data = r.text.strip().split('~')
@@ -81,8 +79,6 @@ def get_market_index():
                 logger.info(f"获取指数 {name}: {result[-1]['price']:.2f}")
         except Exception as e:
             logger.error(f"获取 {name} 失败: {e}")
-        
-        time.sleep(0.5)
     
     return result
 
@@ -181,7 +177,7 @@ def send_telegram(message):
     try:
         url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
         data = {"chat_id": TELEGRAM_CHAT_ID, "text": message, "parse_mode": "Markdown"}
-        resp = requests.post(url, json=data, timeout=10)
+        resp = http_pool.post(url, json=data, timeout=10)
         resp.raise_for_status()
         logger.info("Telegram发送成功")
         return True
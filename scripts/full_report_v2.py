@@ -3,7 +3,7 @@
 A股市场情绪分析报告 - 优化版 V2
 优化点:
 - 并发请求提速 (ThreadPoolExecutor)
-- 多数据源备份 (腾讯API主 + 东方财富备)
+- 多数据源对冲 (腾讯API主 + 东方财富备，按耗时分位数对冲)
 - 缓存机制 (5分钟TTL)
 - 更新自选股池 (11只)
 """
@@ -11,7 +11,7 @@ A股市场情绪分析报告 - 优化版 V2
 import sys
 import json
 import subprocess
-import requests
+import http_pool
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import lru_cache
@@ -23,8 +23,10 @@ shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
 sys.path.insert(0, shared_dir)
 
 from config_loader import config
-from error_handler import handle_errors, retry
+from error_handler import handle_errors
 from logger import setup_logger
+from ttl_cache import TTLCache
+from hedged_quote import get_quote
 
 logger = setup_logger(__name__)
 
@@ -56,86 +58,22 @@ INDICES = [
     ('sh000688', '科创50'),
 ]
 
-# 内存缓存
-cache = {}
+# 内存缓存 - 有界 TTL/LRU，线程安全，并发未命中只回源一次
 CACHE_TTL = 300  # 5分钟
+CACHE_MAX_ENTRIES = 4096
+cache = TTLCache(max_entries=CACHE_MAX_ENTRIES, default_ttl=CACHE_TTL)
 
-def get_cached(key, fetch_fn, *args, **kwargs):
+def get_cached(key, fetch_fn, *args, ttl=None, **kwargs):
     """带TTL的缓存"""
-    now = time.time()
-    if key in cache:
-        value, timestamp = cache[key]
-        if now - timestamp < CACHE_TTL:
-            logger.debug(f"缓存命中: {key}")
-            return value
-    
-    value = fetch_fn(*args, **kwargs)
-    if value is not None:
-        cache[key] = (value, now)
-    return value
-
-@handle_errors(default_return=None)
-@retry(max_retries=2, delay=1)
-def get_stock_price_tencent(code):
-    """腾讯API获取股价 - 主数据源"""
-    market = 'sh' if code.startswith('6') else 'sz'
-    url = f"http://qt.gtimg.cn/q={market}{code}"
-    
-    r = requests.get(url, timeout=5)
-    r.raise_for_status()
-    
-    data = r.text.strip().split('~')
-    if len(data) > 32:
-        return {
-            'name': data[1],
-            'price': float(data[3]),
-            'change': float(data[32]),
-            'volume': int(data[36]) if len(data) > 36 else 0,
-            'source': 'tencent'
-        }
-    return None
-
-@handle_errors(default_return=None)
-def get_stock_price_eastmoney(code):
-    """东方财富API - 备份数据源"""
-    try:
-        market = 1 if code.startswith('6') else 0
-        url = f"https://push2.eastmoney.com/api/qt/stock/get?secid={market}.{code}&fields=f43,f44,f45,f46,f47,f48,f50,f51,f52,f57,f58,f60"
-        r = requests.get(url, timeout=5)
-        data = r.json()
-        
-        if data.get('data'):
-            d = data['data']
-            price = d.get('f43', 0) / 100
-            pre_close = d.get('f44', 0) / 100
-            change = ((price - pre_close) / pre_close * 100) if pre_close else 0
-            return {
-                'name': d.get('f58', 'Unknown'),
-                'price': price,
-                'change': change,
-                'volume': d.get('f47', 0),
-                'source': 'eastmoney'
-            }
-    except Exception as e:
-        logger.debug(f"东方财富API失败: {e}")
-    return None
+    return cache.get_or_load(key, lambda: fetch_fn(*args, **kwargs), ttl=ttl)
 
 def get_stock_price(code, name=None):
-    """获取股价 - 主备切换"""
+    """获取股价 - 腾讯为主，超过分位数截止时间未返回则对冲请求东方财富"""
     cache_key = f"stock_{code}"
     
     def fetch():
-        # 先尝试腾讯
-        data = get_stock_price_tencent(code)
-        if data:
-            # 如果name不匹配，修正它
-            if name and data['name'] != name:
-                data['name'] = name
-            return data
-        
-        # 备用: 东方财富
-        logger.warning(f"腾讯API失败，切换东方财富: {code}")
-        data = get_stock_price_eastmoney(code)
+        data = get_quote(code)
+        # 如果name不匹配，修正它
         if data and name:
             data['name'] = name
         return data
@@ -150,7 +88,7 @@ def fetch_index_single(code_name):
     def fetch():
         try:
             url = f"http://qt.gtimg.cn/q={code}"
-            r = requests.get(url, timeout=5)
+            r = http_pool.get(url, timeout=5)
             data = r.text.strip().split('~')
             if len(data) > 32:
                 return {
@@ -308,7 +246,7 @@ def send_telegram(message):
     try:
         url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
         data = {"chat_id": TELEGRAM_CHAT_ID, "text": message, "parse_mode": "Markdown"}
-        resp = requests.post(url, json=data, timeout=10)
+        resp = http_pool.post(url, json=data, timeout=10)
         resp.raise_for_status()
         logger.info("Telegram发送成功")
         return True
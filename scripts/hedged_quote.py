@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+对冲请求 - 腾讯行情为主，东方财富为备
+
+主源在"分位数截止时间"内未返回时，向备源发出同样的请求，先到的有效结果胜出；
+截止时间取主源最近若干次耗时的 p95 (样本不足时用默认值)，
+因此主源正常时几乎不会多发请求，慢请求的尾延迟被限制在 截止时间 + 备源耗时。
+
+两个源的结果统一为 tencent_quote.parse_quote_fields 的字段格式，并带 source 标记。
+"""
+
+import sys
+import os
+import time
+import threading
+import http_pool
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import Callable, Optional
+
+import numpy as np
+
+# 🚀 使用共享模块
+shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
+sys.path.insert(0, shared_dir)
+
+from logger import setup_logger
+from circuit_breaker import breaker
+from records import Quote, to_jsonable
+from tencent_quote import fetch_quotes, to_symbol
+
+logger = setup_logger(__name__)
+
+EASTMONEY_URL = "https://push2.eastmoney.com/api/qt/stock/get"
+# fltt=2 时价格类字段直接返回浮点数
+EASTMONEY_FIELDS = "f43,f44,f45,f46,f47,f48,f51,f52,f57,f58,f60,f86,f117,f162,f167,f168,f170"
+
+HEDGE_PERCENTILE = 95
+# 样本不足时的默认截止时间，以及截止时间的上下限 (秒)
+DEFAULT_DEADLINE = 0.5
+MIN_DEADLINE = 0.1
+MAX_DEADLINE = 2.0
+MIN_SAMPLES = 20
+SAMPLE_WINDOW = 200
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='hedge')
+
+
+class LatencyTracker:
+    """最近 N 次请求耗时，按分位数给出对冲截止时间"""
+
+    def __init__(self, window: int = SAMPLE_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def deadline(self, percentile: float = HEDGE_PERCENTILE) -> float:
+        with self._lock:
+            samples = list(self._samples)
+        if len(samples) < MIN_SAMPLES:
+            return DEFAULT_DEADLINE
+        return float(min(MAX_DEADLINE, max(MIN_DEADLINE, np.percentile(samples, percentile))))
+
+
+latency = {
+    'tencent': LatencyTracker(),
+    'eastmoney': LatencyTracker(),
+}
+
+
+def _timed(source: str, fn: Callable[[str], Optional[Quote]], code: str) -> Optional[Quote]:
+    start = time.monotonic()
+    try:
+        quote = fn(code)
+    except Exception as e:
+        logger.debug(f"{source} 行情失败 {code}: {e}")
+        return None
+    # 只记录成功的耗时，失败由熔断/限流处理
+    if quote:
+        latency[source].record(time.monotonic() - start)
+        quote.source = source
+    return quote
+
+
+def fetch_quote_tencent(code: str) -> Optional[Quote]:
+    return fetch_quotes([code]).get(to_symbol(code))
+
+
+def _num(value, scale: float = 1.0) -> float:
+    """东财缺失值为 '-'"""
+    try:
+        return float(value) * scale
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def fetch_quote_eastmoney(code: str) -> Optional[Quote]:
+    """东方财富单只行情，字段换算为腾讯格式 (成交额-万元，市值-亿元)"""
+    symbol = to_symbol(code)
+    # 东财市场号: 沪市 1，深市和北交所 (含 920xxx) 为 0
+    market = 1 if symbol.startswith('sh') else 0
+    with breaker('eastmoney').guard():
+        r = http_pool.get(EASTMONEY_URL, params={
+            'secid': f"{market}.{symbol[2:]}",
+            'fields': EASTMONEY_FIELDS,
+            'fltt': 2,
+        }, timeout=5)
+        r.raise_for_status()
+        d = r.json().get('data')
+    if not d or not isinstance(d.get('f43'), (int, float)):
+        return None
+
+    ts = d.get('f86')
+    return Quote(
+        code=str(d.get('f57') or symbol[2:]),
+        name=d.get('f58') or '',
+        price=_num(d.get('f43')),
+        pre_close=_num(d.get('f60')),
+        open=_num(d.get('f46')),
+        high=_num(d.get('f44')),
+        low=_num(d.get('f45')),
+        change=_num(d.get('f170')),
+        time=datetime.fromtimestamp(ts).strftime('%Y%m%d%H%M%S') if ts else '',
+        volume=int(_num(d.get('f47'))),
+        amount=_num(d.get('f48'), 1e-4),
+        turnover=_num(d.get('f168')),
+        pe=_num(d.get('f162')),
+        pb=_num(d.get('f167')),
+        market_cap=_num(d.get('f117'), 1e-8),  # 流通市值，对应腾讯字段 44
+        limit_up=_num(d.get('f51')),
+        limit_down=_num(d.get('f52')),
+    )
+
+
+SOURCES = {
+    'tencent': fetch_quote_tencent,
+    'eastmoney': fetch_quote_eastmoney,
+}
+
+
+def get_quote(code: str, primary: str = 'tencent', secondary: str = 'eastmoney',
+              percentile: float = HEDGE_PERCENTILE, hedge: bool = True) -> Optional[Quote]:
+    """
+    对冲获取单只行情
+
+    参数:
+        percentile: 主源耗时分位数，超过该截止时间仍未返回则同时请求备源
+        hedge: False 时退化为串行主备切换
+    返回:
+        腾讯格式的行情字典 (含 source)，两个源都失败返回 None
+    """
+    first = _executor.submit(_timed, primary, SOURCES[primary], code)
+    done, _ = wait([first], timeout=latency[primary].deadline(percentile) if hedge else None)
+    if done and first.result():
+        return first.result()
+
+    if done:
+        logger.warning(f"{primary} 行情失败，切换 {secondary}: {code}")
+    else:
+        logger.debug(f"{primary} 行情超过截止时间，对冲请求 {secondary}: {code}")
+    pending = {first, _executor.submit(_timed, secondary, SOURCES[secondary], code)} - done
+
+    # 先到的有效结果胜出；落后的请求在后台自然结束 (结果丢弃)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.result():
+                return future.result()
+    return None
+
+
+if __name__ == '__main__':
+    import json
+
+    for code in sys.argv[1:] or ['600118', '300456']:
+        start = time.time()
+        quote = get_quote(code)
+        print(json.dumps(quote, ensure_ascii=False, default=to_jsonable))
+        print(f"耗时 {time.time() - start:.3f}s")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+本地日线历史库 - 列式存储 + 增量追加
+
+存储结构:
+    ~/.openclaw/workspace/data/stock-sentiment-cn/history/<symbol>/<column>.npy
+    每列一个 .npy 文件，读取时内存映射，只加载需要的尾部数据
+
+更新策略:
+    只拉取最后一根已存K线之后的数据（腾讯 fqkline 接口支持起始日期）
+    盘中未收盘的当日K线不落盘；已有最近收盘交易日的K线时不联网（周末/节假日零请求）
+"""
+
+import sys
+import os
+import numpy as np
+import http_pool
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+# 🚀 使用共享模块
+shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
+sys.path.insert(0, shared_dir)
+
+from logger import setup_logger
+from circuit_breaker import breaker
+from records import Bar
+from tencent_quote import to_symbol
+from trading_calendar import last_completed_trading_day
+
+logger = setup_logger(__name__)
+
+DATA_DIR = os.path.expanduser("~/.openclaw/workspace/data/stock-sentiment-cn")
+HISTORY_DIR = os.path.join(DATA_DIR, 'history')
+
+# 腾讯日线接口 param=代码,day,起始日期,结束日期,条数,复权
+KLINE_URL = "http://web.ifzq.gtimg.cn/appstock/app/fqkline/get"
+
+# 首次建库拉取的交易日数
+HISTORY_DAYS = 250
+
+# 列定义: 日期为 yyyymmdd 整数
+COLUMNS = (
+    ('date', np.int32),
+    ('open', np.float64),
+    ('close', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('volume', np.float64),
+)
+
+def date_to_int(text: str) -> int:
+    """'2026-02-06' -> 20260206"""
+    return int(text.replace('-', '')[:8])
+
+
+def int_to_date(value: int) -> str:
+    """20260206 -> '2026-02-06'"""
+    s = str(value)
+    return f"{s[:4]}-{s[4:6]}-{s[6:8]}"
+
+
+def fetch_daily_bars(symbol: str, start: Optional[str] = None, count: int = HISTORY_DAYS) -> List[Bar]:
+    """
+    获取日线 (不复权)
+
+    参数:
+        start: 起始日期 'YYYY-MM-DD'，为空时取最近 count 根
+    """
+    param = f"{symbol},day,{start or ''},,{count},"
+    with breaker('tencent_daily').guard():
+        r = http_pool.get(KLINE_URL, params={'param': param}, timeout=10)
+        r.raise_for_status()
+        data = r.json().get('data') or {}
+    rows = (data.get(symbol) or {}).get('day') or []
+
+    bars = []
+    for row in rows:
+        try:
+            bars.append(Bar(
+                date_to_int(row[0]),
+                float(row[1]), float(row[2]), float(row[3]), float(row[4]), float(row[5]),
+            ))
+        except (ValueError, IndexError, TypeError):
+            continue
+    return bars
+
+
+class HistoryStore:
+    """按代码分目录的列式日线库"""
+
+    def __init__(self, root: str = HISTORY_DIR):
+        self.root = root
+
+    def _path(self, symbol: str, column: str) -> str:
+        return os.path.join(self.root, symbol, f"{column}.npy")
+
+    def read(self, symbol: str, days: Optional[int] = None) -> Optional[Dict[str, np.ndarray]]:
+        """读取最近 days 根K线，返回 {列名: 内存映射数组}"""
+        columns = {}
+        for name, _ in COLUMNS:
+            path = self._path(symbol, name)
+            if not os.path.exists(path):
+                return None
+            columns[name] = np.load(path, mmap_mode='r')
+
+        # 写入中断时各列长度可能不一致，以最短列为准
+        n = min(len(col) for col in columns.values())
+        if n == 0:
+            return None
+        start = max(0, n - days) if days else 0
+        return {name: col[start:n] for name, col in columns.items()}
+
+    def last_date(self, symbol: str) -> Optional[int]:
+        path = self._path(symbol, 'date')
+        if not os.path.exists(path):
+            return None
+        dates = np.load(path, mmap_mode='r')
+        return int(dates[-1]) if len(dates) else None
+
+    def append(self, symbol: str, bars: List[Bar]) -> int:
+        """追加K线（只保留晚于已存最后日期的部分），返回新增条数"""
+        last = self.last_date(symbol)
+        if last is not None:
+            bars = [b for b in bars if b.date > last]
+        if not bars:
+            return 0
+
+        os.makedirs(os.path.join(self.root, symbol), exist_ok=True)
+        existing = self.read(symbol)
+
+        # 日期列最后写入：中断时其余列多出的数据会被 read() 截掉
+        for name, dtype in reversed(COLUMNS):
+            new = np.array([getattr(b, name) for b in bars], dtype=dtype)
+            if existing is not None:
+                new = np.concatenate([np.asarray(existing[name]), new])
+            path = self._path(symbol, name)
+            tmp = f"{path}.tmp.npy"
+            np.save(tmp, new)
+            os.replace(tmp, path)
+        return len(bars)
+
+    def update(self, symbol: str, now: Optional[datetime] = None) -> int:
+        """增量更新: 只拉取最后已存日期之后、最近收盘交易日及之前的K线"""
+        target = int(last_completed_trading_day(now).strftime('%Y%m%d'))
+        last = self.last_date(symbol)
+        if last is not None and last >= target:
+            return 0
+
+        start = None
+        if last is not None:
+            start = (datetime.strptime(str(last), '%Y%m%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+
+        # 盘中的当日K线仍在变化，不落盘
+        bars = [b for b in fetch_daily_bars(symbol, start=start) if b.date <= target]
+
+        added = self.append(symbol, bars)
+        if added:
+            logger.debug(f"{symbol} 新增 {added} 根K线")
+        return added
+
+    def closes(self, symbol: str, days: int) -> Optional[np.ndarray]:
+        data = self.read(symbol, days)
+        return data['close'] if data else None
+
+
+store = HistoryStore()
+
+
+def get_history(code: str, days: int = 20, refresh: bool = True) -> Optional[Dict[str, np.ndarray]]:
+    """获取最近 days 根已收盘日线（先增量更新）"""
+    symbol = to_symbol(code)
+    if refresh:
+        try:
+            store.update(symbol)
+        except Exception as e:
+            logger.debug(f"日线增量更新失败 {symbol}: {e}")
+    return store.read(symbol, days)
+
+
+if __name__ == '__main__':
+    for code in sys.argv[1:] or ['600118']:
+        data = get_history(code, 20)
+        if data is None:
+            print(f"❌ {code}: 无数据")
+            continue
+        print(f"✅ {code}: {len(data['close'])}根, 最后日期 {int_to_date(int(data['date'][-1]))}, "
+              f"收盘 {data['close'][-1]:.2f}")
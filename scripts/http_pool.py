@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+共享 HTTP 连接池 - 每个域名一个 Session
+
+- keep-alive 复用 TCP/TLS 连接 (qt.gtimg.cn、push2.eastmoney.com、api.telegram.org ...)
+- 连接池大小按并发度预留
+- gzip 压缩
+- 重试和退避在 Adapter 层完成: 连接失败、429、5xx 自动重试；POST 只在连接失败时重试，避免重复发送
+- 每个请求先经过域名限流器 (rate_limit): 令牌桶限速 + 自适应并发窗口
+
+用法:
+    import http_pool
+    r = http_pool.get(url, timeout=5)
+    r = http_pool.post(url, json=data, timeout=10)
+"""
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from urllib3.util.retry import Retry
+from typing import Dict
+
+from rate_limit import limiter_for
+
+POOL_SIZE = 16
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 0.3
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+def _new_session(pool_size: int = POOL_SIZE) -> requests.Session:
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=MAX_RETRIES,
+        status=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session(host: str) -> requests.Session:
+    """获取域名对应的共享 Session (线程安全，首次调用时创建)"""
+    session = _sessions.get(host)
+    if session is None:
+        with _lock:
+            session = _sessions.get(host)
+            if session is None:
+                session = _sessions[host] = _new_session()
+    return session
+
+
+def session_for(url: str) -> requests.Session:
+    return get_session(urlsplit(url).netloc)
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    host = urlsplit(url).netloc
+    with limiter_for(host).slot() as slot:
+        r = get_session(host).request(method, url, **kwargs)
+        slot.record(r.status_code)
+    return r
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request('GET', url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request('POST', url, **kwargs)
+
+
+def close_all():
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+向量化技术指标引擎
+
+输入二维收盘价矩阵 (股票数 × 交易日)，一次计算全部股票的:
+- MA5 / MA10 / MA20
+- 乖离率 BIAS5
+- RSI (Wilder 平滑)
+- 支撑位/压力位 (窗口内低点/高点)
+- 趋势标签 (多头/空头/震荡)
+
+历史长度不一的股票在左侧用 NaN 补齐 (见 closes_matrix)
+
+盘中轮询使用 IndicatorState: 每只股票保存截至昨日的滚动状态，新价格 O(1) 更新，可序列化续用
+"""
+
+import json
+import os
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+RSI_PERIOD = 14
+# 少于该数量的涨跌样本时 RSI 记为中性 50
+RSI_MIN_SAMPLES = 5
+SR_WINDOW = 20
+
+TREND_UP = "多头"
+TREND_DOWN = "空头"
+TREND_FLAT = "震荡"
+
+
+def closes_matrix(series: Sequence[Sequence[float]], days: Optional[int] = None) -> np.ndarray:
+    """把长度不一的收盘价序列对齐成矩阵，右对齐，左侧补 NaN"""
+    width = days or max((len(s) for s in series), default=0)
+    matrix = np.full((len(series), width), np.nan)
+    for i, s in enumerate(series):
+        tail = np.asarray(s, dtype=np.float64)[-width:] if width else []
+        if len(tail):
+            matrix[i, width - len(tail):] = tail
+    return matrix
+
+
+def _rolling_mean_last(closes: np.ndarray, n: int) -> np.ndarray:
+    """最后 n 日均值，样本不足 n 个的记为 NaN"""
+    window = closes[:, -n:]
+    valid = np.sum(~np.isnan(window), axis=1)
+    with np.errstate(invalid='ignore'):
+        mean = np.nansum(window, axis=1) / n
+    mean[valid < n] = np.nan
+    return mean
+
+
+def wilder_rsi(closes: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    """
+    Wilder RSI
+
+    前 period 个涨跌幅取简单均值作为种子，之后 avg = (avg*(period-1) + x) / period
+    按时间轴迭代，每一步对全部股票向量化；NaN 补齐部分自动跳过
+    样本不足 period 时退化为可用样本的简单均值
+    """
+    rows = closes.shape[0]
+    deltas = np.diff(closes, axis=1)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+    valid = ~np.isnan(deltas)
+
+    count = np.zeros(rows, dtype=np.int64)
+    avg_gain = np.zeros(rows)
+    avg_loss = np.zeros(rows)
+
+    for t in range(deltas.shape[1]):
+        v = valid[:, t]
+        g = gains[:, t]
+        l = losses[:, t]
+        seeding = v & (count < period)
+        smoothing = v & (count >= period)
+
+        # 种子阶段累加，满 period 个时转为均值
+        avg_gain[seeding] += g[seeding]
+        avg_loss[seeding] += l[seeding]
+        count[v] += 1
+        seeded = seeding & (count == period)
+        avg_gain[seeded] /= period
+        avg_loss[seeded] /= period
+
+        avg_gain[smoothing] = (avg_gain[smoothing] * (period - 1) + g[smoothing]) / period
+        avg_loss[smoothing] = (avg_loss[smoothing] * (period - 1) + l[smoothing]) / period
+
+    partial = (count > 0) & (count < period)
+    avg_gain[partial] /= count[partial]
+    avg_loss[partial] /= count[partial]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    rsi[(avg_loss == 0) & (avg_gain > 0)] = 100.0
+    rsi[(avg_loss == 0) & (avg_gain == 0)] = 50.0
+    rsi[count < RSI_MIN_SAMPLES] = 50.0
+    return rsi
+
+
+def trend_labels(ma5: np.ndarray, ma10: np.ndarray, ma20: np.ndarray) -> np.ndarray:
+    up = (ma5 > ma10) & (ma10 > ma20)
+    down = (ma5 < ma10) & (ma10 < ma20)
+    return np.where(up, TREND_UP, np.where(down, TREND_DOWN, TREND_FLAT))
+
+
+def calc_indicators(closes: np.ndarray, prices: Optional[np.ndarray] = None,
+                    rsi_period: int = RSI_PERIOD, sr_window: int = SR_WINDOW) -> Dict[str, np.ndarray]:
+    """
+    批量计算技术指标
+
+    参数:
+        closes: (股票数, 交易日) 收盘价矩阵，最后一列为最新
+        prices: 每只股票的最新价，默认取最后一个有效收盘价
+    返回:
+        {'ma5', 'ma10', 'ma20', 'bias5', 'rsi', 'support', 'resistance', 'trend'}，每项长度为股票数
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    if closes.ndim != 2:
+        raise ValueError(f"closes 需为二维矩阵，实际维度 {closes.ndim}")
+
+    if prices is None:
+        # 每行最后一个非 NaN 值
+        last_idx = closes.shape[1] - 1 - np.argmax(~np.isnan(closes[:, ::-1]), axis=1)
+        prices = closes[np.arange(closes.shape[0]), last_idx]
+    prices = np.asarray(prices, dtype=np.float64)
+
+    ma5 = _rolling_mean_last(closes, 5)
+    ma10 = _rolling_mean_last(closes, 10)
+    ma20 = _rolling_mean_last(closes, 20)
+    # 历史不足时逐级退化: MA10 缺失用 MA5，MA20 缺失用 MA10
+    ma5 = np.where(np.isnan(ma5), prices, ma5)
+    ma10 = np.where(np.isnan(ma10), ma5, ma10)
+    ma20 = np.where(np.isnan(ma20), ma10, ma20)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bias5 = np.where(ma5 != 0, (prices - ma5) / ma5 * 100, 0.0)
+
+    window = closes[:, -sr_window:]
+    empty = np.all(np.isnan(window), axis=1)
+    with np.errstate(all='ignore'):
+        filled = np.where(np.isnan(window), np.inf, window)
+        support = np.where(empty, prices * 0.95, filled.min(axis=1, initial=np.inf))
+        filled = np.where(np.isnan(window), -np.inf, window)
+        resistance = np.where(empty, prices * 1.05, filled.max(axis=1, initial=-np.inf))
+
+    return {
+        'ma5': ma5,
+        'ma10': ma10,
+        'ma20': ma20,
+        'bias5': bias5,
+        'rsi': wilder_rsi(closes, rsi_period),
+        'support': support,
+        'resistance': resistance,
+        'trend': trend_labels(ma5, ma10, ma20),
+    }
+
+
+def calc_stock_indicators(price: float, closes: List[float]) -> Dict:
+    """单只股票的便捷封装，返回 {指标名: 值} (trend 为字符串，其余为浮点数)"""
+    result = calc_indicators(closes_matrix([closes]), np.array([price]))
+    return {
+        key: (str(values[0]) if key == 'trend' else float(values[0]))
+        for key, values in result.items()
+    }
+
+
+class IndicatorState:
+    """
+    单只股票的增量指标状态
+
+    保存截至最后一根已收盘K线 (base_date) 的滚动窗口和 Wilder 均值，
+    盘中每次轮询只需 update(price)，O(1) 得到与 calc_stock_indicators(price, closes + [price]) 相同的结果；
+    收盘后 roll(close, date) 把当日K线并入状态
+    """
+
+    WINDOW = max(SR_WINDOW, 20)
+
+    def __init__(self, symbol: str, base_date: int = 0, window: Optional[List[float]] = None,
+                 rsi_count: int = 0, gain_acc: float = 0.0, loss_acc: float = 0.0,
+                 period: int = RSI_PERIOD, synced_on: int = 0):
+        self.symbol = symbol
+        self.base_date = base_date
+        self.window = list(window or [])[-self.WINDOW:]
+        # Wilder 状态: 样本数不足 period 时 *_acc 为累计和，之后为平滑均值
+        self.rsi_count = rsi_count
+        self.gain_acc = gain_acc
+        self.loss_acc = loss_acc
+        self.period = period
+        # 最后一次与本地日线库同步的日期 (yyyymmdd)
+        self.synced_on = synced_on
+        self._prepare()
+
+    @classmethod
+    def from_closes(cls, symbol: str, closes: Sequence[float], base_date: int = 0,
+                    period: int = RSI_PERIOD, synced_on: int = 0) -> 'IndicatorState':
+        """由已收盘K线重建状态"""
+        state = cls(symbol, base_date=base_date, period=period, synced_on=synced_on)
+        closes = [float(c) for c in closes]
+        if closes:
+            state.window = [closes[0]]
+            for close in closes[1:]:
+                state._push(close)
+        state._prepare()
+        return state
+
+    def _prepare(self):
+        """预计算滚动窗口的部分和与极值，供 update() 常数时间使用"""
+        w = self.window
+        self._tail_sums = {n: sum(w[-(n - 1):]) if len(w) >= n - 1 else None for n in (5, 10, 20)}
+        tail = w[-(SR_WINDOW - 1):]
+        self._tail_min = min(tail) if tail else None
+        self._tail_max = max(tail) if tail else None
+
+    def _wilder_step(self, close: float):
+        """以 close 作为下一个收盘价推进一步 Wilder 均值，返回新的 (count, gain, loss)"""
+        delta = close - self.window[-1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        count = self.rsi_count + 1
+        p = self.period
+        if count < p:
+            return count, self.gain_acc + gain, self.loss_acc + loss
+        if count == p:
+            return count, (self.gain_acc + gain) / p, (self.loss_acc + loss) / p
+        return count, (self.gain_acc * (p - 1) + gain) / p, (self.loss_acc * (p - 1) + loss) / p
+
+    def _push(self, close: float):
+        if self.window:
+            self.rsi_count, self.gain_acc, self.loss_acc = self._wilder_step(close)
+        self.window = (self.window + [close])[-self.WINDOW:]
+
+    def _rsi(self, count: int, gain_acc: float, loss_acc: float) -> float:
+        if count < RSI_MIN_SAMPLES:
+            return 50.0
+        if count < self.period:
+            gain_acc, loss_acc = gain_acc / count, loss_acc / count
+        if loss_acc == 0:
+            return 100.0 if gain_acc > 0 else 50.0
+        return 100 - 100 / (1 + gain_acc / loss_acc)
+
+    def update(self, price: float) -> Dict:
+        """以最新价作为当日收盘价计算指标 (不修改状态)"""
+        price = float(price)
+        mas = {}
+        for n in (5, 10, 20):
+            tail = self._tail_sums[n]
+            mas[n] = (tail + price) / n if tail is not None else None
+        ma5 = mas[5] if mas[5] is not None else price
+        ma10 = mas[10] if mas[10] is not None else ma5
+        ma20 = mas[20] if mas[20] is not None else ma10
+
+        if self.window:
+            rsi = self._rsi(*self._wilder_step(price))
+            support = min(self._tail_min, price) if self._tail_min is not None else price
+            resistance = max(self._tail_max, price) if self._tail_max is not None else price
+        else:
+            rsi = 50.0
+            support, resistance = price, price
+
+        return {
+            'ma5': ma5,
+            'ma10': ma10,
+            'ma20': ma20,
+            'bias5': (price - ma5) / ma5 * 100 if ma5 else 0.0,
+            'rsi': rsi,
+            'support': support,
+            'resistance': resistance,
+            'trend': TREND_UP if ma5 > ma10 > ma20 else TREND_DOWN if ma5 < ma10 < ma20 else TREND_FLAT,
+        }
+
+    def current(self) -> Dict:
+        """最后一根已收盘K线上的指标 (当日K线已落盘时使用)"""
+        if not self.window:
+            return {}
+        result = calc_stock_indicators(self.window[-1], self.window)
+        result['rsi'] = self._rsi(self.rsi_count, self.gain_acc, self.loss_acc)
+        return result
+
+    def roll(self, close: float, date: int):
+        """收盘后把当日K线并入状态"""
+        if date <= self.base_date:
+            return
+        self._push(float(close))
+        self.base_date = date
+        self._prepare()
+
+    def to_dict(self) -> Dict:
+        return {
+            'symbol': self.symbol,
+            'base_date': self.base_date,
+            'window': self.window,
+            'rsi_count': self.rsi_count,
+            'gain_acc': self.gain_acc,
+            'loss_acc': self.loss_acc,
+            'period': self.period,
+            'synced_on': self.synced_on,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'IndicatorState':
+        return cls(**data)
+
+
+def save_states(path: str, states: Dict[str, IndicatorState]):
+    """保存全部增量状态到 JSON (先写临时文件再替换)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({symbol: s.to_dict() for symbol, s in states.items()}, f)
+    os.replace(tmp, path)
+
+
+def load_states(path: str) -> Dict[str, IndicatorState]:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return {symbol: IndicatorState.from_dict(d) for symbol, d in json.load(f).items()}
+    except (ValueError, TypeError, KeyError):
+        return {}
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+涨跌停价计算 - 按板块区分涨跌幅限制，全市场向量化
+
+涨跌幅限制:
+    主板 10%，主板 ST/*ST 5%
+    创业板 (300/301)、科创板 (688/689) 20% (含 ST)
+    北交所 30%
+    新股上市首日 (名称以 N 开头)、创业板/科创板上市前 5 日 (C 开头) 不设涨跌幅限制，记为 NaN
+涨跌停价 = 昨收 × (1 ± 限制)，按交易所规则四舍五入到分 (不是 np.round 的银行家舍入)
+
+标记 (limit_flags):
+    at_limit_up / at_limit_down   最新价在涨停/跌停价
+    opened_up                     盘中触及涨停后打开 (炸板)
+    opened_down                   盘中触及跌停后打开 (翘板)
+
+连板数 (limit_streaks) 来自本地日线库: 今日涨停 + 之前连续涨停的交易日数。
+日线库原本只有自选股，计算前先对今日涨停的股票 (通常不到 200 只) 并发增量更新日线，
+已是最新的股票不联网；读取和计算只针对这些股票，在毫秒级。
+"""
+
+import sys
+import os
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+
+# 🚀 使用共享模块
+shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
+sys.path.insert(0, shared_dir)
+
+from logger import setup_logger
+from history_store import store as history_store, HistoryStore
+from indicators import closes_matrix
+from tencent_quote import to_symbol, BSE_PREFIXES
+
+logger = setup_logger(__name__)
+
+BOARD_MAIN = '主板'
+BOARD_CHINEXT = '创业板'
+BOARD_STAR = '科创板'
+BOARD_BSE = '北交所'
+
+# 代码前缀 -> 板块，按顺序匹配，都不匹配为主板
+BOARD_PREFIXES = (
+    (('300', '301'), BOARD_CHINEXT),
+    (('688', '689'), BOARD_STAR),
+    (BSE_PREFIXES, BOARD_BSE),
+)
+
+# 板块 -> 涨跌幅限制
+BOARD_LIMITS = {
+    BOARD_MAIN: 0.10,
+    BOARD_CHINEXT: 0.20,
+    BOARD_STAR: 0.20,
+    BOARD_BSE: 0.30,
+}
+ST_LIMIT = 0.05
+
+# 价格比较容差 (分以下的浮点误差)
+PRICE_EPS = 1e-6
+# 连板数最多回看的交易日
+STREAK_LOOKBACK = 20
+# 更新涨停股日线的并发数
+STREAK_WORKERS = 16
+
+FLAG_DTYPE = np.dtype([
+    ('at_limit_up', '?'),
+    ('at_limit_down', '?'),
+    ('opened_up', '?'),
+    ('opened_down', '?'),
+])
+
+
+def board_of(codes: np.ndarray) -> np.ndarray:
+    """按代码前缀向量化判断板块"""
+    codes = np.asarray(codes, dtype='U6')
+    boards = np.full(len(codes), BOARD_MAIN, dtype='U3')
+    for prefixes, board in BOARD_PREFIXES:
+        mask = np.zeros(len(codes), dtype=bool)
+        for prefix in prefixes:
+            mask |= np.char.startswith(codes, prefix)
+        boards[mask] = board
+    return boards
+
+
+def limit_rates(boards: np.ndarray, names: np.ndarray) -> np.ndarray:
+    """涨跌幅限制 (小数)，不设限制的新股为 NaN"""
+    boards = np.asarray(boards)
+    names = np.char.upper(np.asarray(names, dtype=str))
+    rates = np.full(len(boards), BOARD_LIMITS[BOARD_MAIN])
+    for board, rate in BOARD_LIMITS.items():
+        rates[boards == board] = rate
+
+    st = (boards == BOARD_MAIN) & (np.char.find(names, 'ST') >= 0)
+    rates[st] = ST_LIMIT
+
+    new_listing = np.char.startswith(names, 'N') | \
+        (np.char.startswith(names, 'C') & ((boards == BOARD_CHINEXT) | (boards == BOARD_STAR)))
+    rates[new_listing] = np.nan
+    return rates
+
+
+def round_price(prices: np.ndarray) -> np.ndarray:
+    """四舍五入到分 (先消除 x*100 的浮点误差，再 +0.5 取整)"""
+    cents = np.round(np.asarray(prices, dtype=np.float64) * 100, 6)
+    return np.floor(cents + 0.5) / 100
+
+
+def limit_prices(pre_close: np.ndarray, rates: np.ndarray):
+    """返回 (涨停价, 跌停价)；昨收无效或不设限制时为 NaN"""
+    pre_close = np.asarray(pre_close, dtype=np.float64)
+    valid = pre_close > 0
+    with np.errstate(invalid='ignore'):
+        up = np.where(valid, round_price(pre_close * (1 + rates)), np.nan)
+        down = np.where(valid, round_price(pre_close * (1 - rates)), np.nan)
+    return up, down
+
+
+def limit_flags(price: np.ndarray, high: np.ndarray, low: np.ndarray,
+                limit_up: np.ndarray, limit_down: np.ndarray) -> np.ndarray:
+    """涨跌停/炸板标记，NaN 涨跌停价 (无限制) 的行全部为 False"""
+    flags = np.zeros(len(price), dtype=FLAG_DTYPE)
+    with np.errstate(invalid='ignore'):
+        touched_up = high >= limit_up - PRICE_EPS
+        touched_down = (low > 0) & (low <= limit_down + PRICE_EPS)
+        flags['at_limit_up'] = (price > 0) & (price >= limit_up - PRICE_EPS)
+        flags['at_limit_down'] = (price > 0) & (price <= limit_down + PRICE_EPS) & ~flags['at_limit_up']
+    flags['opened_up'] = touched_up & ~flags['at_limit_up']
+    flags['opened_down'] = touched_down & ~flags['at_limit_down']
+    return flags
+
+
+def _update_history(store: HistoryStore, symbols: list):
+    """并发增量更新日线；单只失败只影响该股的连板数"""
+    def update(symbol):
+        try:
+            store.update(symbol)
+        except Exception as e:
+            logger.debug(f"日线增量更新失败 {symbol}: {e}")
+
+    with ThreadPoolExecutor(max_workers=min(STREAK_WORKERS, len(symbols)), thread_name_prefix='streak') as executor:
+        list(executor.map(update, symbols))
+
+
+def limit_streaks(codes: np.ndarray, rates: np.ndarray, today: Optional[int] = None,
+                  store: Optional[HistoryStore] = None, lookback: int = STREAK_LOOKBACK,
+                  refresh: bool = True) -> np.ndarray:
+    """
+    连板数 (含今日)，调用方只传入今日涨停的股票
+
+    参数:
+        today: yyyymmdd，日线库中该日及之后的K线 (收盘后已落盘的当日K线) 不计入历史
+        refresh: 先增量更新这些股票的日线 (不在自选股中的股票本地没有历史)
+    返回:
+        与 codes 等长的整数数组；更新失败且没有本地历史的股票记为 1
+    """
+    store = store or history_store
+    today = today or int(datetime.now().strftime('%Y%m%d'))
+    symbols = [to_symbol(str(code)) for code in codes]
+    if refresh and symbols:
+        _update_history(store, symbols)
+
+    series = []
+    for symbol in symbols:
+        data = store.read(symbol, lookback + 2)
+        if data is None:
+            series.append([])
+            continue
+        series.append(np.asarray(data['close'])[np.asarray(data['date']) < today][-(lookback + 1):])
+
+    if not series:
+        return np.zeros(0, dtype=np.int64)
+    closes = closes_matrix(series, lookback + 1)
+    if closes.shape[1] < 2:
+        return np.ones(len(codes), dtype=np.int64)
+
+    up, _ = limit_prices(closes[:, :-1], np.asarray(rates, dtype=np.float64)[:, None])
+    with np.errstate(invalid='ignore'):
+        hit = closes[:, 1:] >= up - PRICE_EPS
+    # 从最近一天往前数连续涨停
+    trailing = np.cumprod(hit[:, ::-1], axis=1).sum(axis=1)
+    return 1 + trailing.astype(np.int64)
+
+
+def streak_summary(names: np.ndarray, streaks: np.ndarray, limit: int = 3) -> Dict:
+    """{'max_streak', 'multi_limit'(2连板及以上家数), 'streak_leaders': [(名称, 连板数), ...]}"""
+    if not len(streaks):
+        return {'max_streak': 0, 'multi_limit': 0, 'streak_leaders': []}
+    order = np.argsort(-streaks, kind='stable')[:limit]
+    return {
+        'max_streak': int(streaks.max()),
+        'multi_limit': int(np.count_nonzero(streaks >= 2)),
+        'streak_leaders': [(str(names[i]), int(streaks[i])) for i in order if streaks[i] >= 2],
+    }
+
+
+if __name__ == '__main__':
+    codes = np.array(sys.argv[1:] or ['600118', '300456', '688981', '830799', '600200'])
+    names = np.array(['中国卫星', '赛微电子', '中芯国际', '艾融软件', '*ST某某'][:len(codes)] +
+                     [''] * max(0, len(codes) - 5))
+    pre_close = np.full(len(codes), 10.05)
+    rates = limit_rates(board_of(codes), names)
+    up, down = limit_prices(pre_close, rates)
+    for row in zip(codes, board_of(codes), rates, up, down):
+        print(*row)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+AI 分析结果缓存 - 按内容寻址
+
+缓存键 = sha256(归一化后的市场状态 + 模型名 + 提示词模板)
+    - 浮点数按 STATE_DIGITS 位小数取整，大的计数 (涨跌家数等) 保留 COUNT_SIG_FIGS 位有效数字，
+      微小的行情跳动不会让缓存失效
+    - 模板或模型变化时自动换键，不需要手动清缓存
+输出保存在共享的 SQLite 磁盘缓存中 (disk_cache)，交易时段有效期 LLM_TTL，
+休市期间有效到下一次开盘 (trading_calendar.cache_ttl)；盘后重跑、--test 重跑直接命中。
+
+用法:
+    text = llm_cache.get_or_call(state, model, template, lambda: call_minimax(prompt))
+"""
+
+import sys
+import os
+import json
+import hashlib
+from typing import Any, Callable, Optional
+
+# 🚀 使用共享模块
+shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
+sys.path.insert(0, shared_dir)
+
+from logger import setup_logger
+from ttl_cache import TTLCache
+from disk_cache import open_disk_cache
+from records import Record
+from trading_calendar import cache_ttl
+
+logger = setup_logger(__name__)
+
+KEY_PREFIX = 'llm_'
+# 交易时段的有效期 (秒)
+LLM_TTL = 1800
+STATE_DIGITS = 1
+COUNT_SIG_FIGS = 2
+
+
+def _round_count(value: int, sig_figs: int = COUNT_SIG_FIGS) -> int:
+    """3012 -> 3000，两位数及以下原样返回"""
+    digits = len(str(abs(value)))
+    if digits <= sig_figs:
+        return value
+    step = 10 ** (digits - sig_figs)
+    return int(round(value / step)) * step
+
+
+def normalize(value: Any, digits: int = STATE_DIGITS) -> Any:
+    """把市场状态转为可稳定序列化的结构: 数值取整、记录转 dict、dict 键排序"""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, int):
+        return _round_count(value)
+    if isinstance(value, float):
+        return round(value, digits)
+    if isinstance(value, Record):
+        value = value.to_dict()
+    if isinstance(value, dict):
+        return {str(k): normalize(v, digits) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v, digits) for v in value]
+    if hasattr(value, 'item'):
+        # numpy 标量
+        return normalize(value.item(), digits)
+    return str(value)
+
+
+def state_key(state: Any, model: str, template: str) -> str:
+    payload = json.dumps({
+        'state': normalize(state),
+        'model': model,
+        'template': template,
+    }, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return KEY_PREFIX + hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """AI 输出缓存，内存 + 磁盘两级；只缓存非空结果"""
+
+    def __init__(self, backend=None, ttl: float = LLM_TTL, max_entries: int = 256):
+        self.ttl = ttl
+        self._cache = TTLCache(max_entries=max_entries, default_ttl=ttl, backend=backend)
+
+    @property
+    def backend(self):
+        return self._cache.backend
+
+    @backend.setter
+    def backend(self, backend):
+        self._cache.backend = backend
+
+    def get_or_call(self, state: Any, model: str, template: str,
+                    call: Callable[[], Optional[str]]) -> Optional[str]:
+        """
+        命中直接返回缓存的输出，未命中时执行 call 并缓存
+
+        并发的相同请求只调用一次 (TTLCache single-flight)
+        """
+        key = state_key(state, model, template)
+        called = []
+
+        def load():
+            called.append(True)
+            return call()
+
+        result = self._cache.get_or_load(key, load, ttl=cache_ttl(self.ttl))
+        if result is not None and not called:
+            logger.info(f"AI分析命中缓存 ({key[len(KEY_PREFIX):][:12]})")
+        return result
+
+    def stats(self):
+        return self._cache.stats()
+
+
+def open_llm_cache(disk: bool = True) -> LLMCache:
+    return LLMCache(backend=open_disk_cache() if disk else None)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+流式 LLM 客户端 - 多个等价端点竞速
+
+OpenAI 兼容的 chat/completions 接口 (stream=true, SSE):
+    - 先请求第一个端点；HEDGE_DELAY 秒内没有收到首个 token (或它已失败) 就启动下一个端点
+      hedge_delay=0 时所有端点同时开始
+    - 最先吐出首个 token 的端点胜出，其余端点的连接立即关闭
+    - 首 token 超时 FIRST_TOKEN_TIMEOUT，流读取单次超时 READ_TIMEOUT：挂起的端点不会再让报告多等 30s
+
+每次调用返回 Completion，带首 token 耗时 (ttft)、总耗时、token 数和生成速度 (tokens/s)；
+客户端本身不保存调用状态，可被多个线程同时使用。
+
+用法:
+    client = LLMClient([Endpoint('gateway', url1, model1), Endpoint('direct', url2, model2, headers)])
+    result = client.complete([{'role': 'user', 'content': prompt}], max_tokens=2000)
+    if result:
+        print(result.text, result.ttft, result.tokens_per_s)
+"""
+
+import sys
+import os
+import json
+import time
+import threading
+import http_pool
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+
+# 🚀 使用共享模块
+shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
+sys.path.insert(0, shared_dir)
+
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 第一个端点多久没出首 token 就启动下一个 (秒)
+HEDGE_DELAY = 2.0
+FIRST_TOKEN_TIMEOUT = 30
+CONNECT_TIMEOUT = 5
+# 流式响应两个数据块之间的最长间隔
+READ_TIMEOUT = 30
+TOTAL_TIMEOUT = 120
+
+# 每次调用最多占用 len(endpoints) 个线程；落败端点在等待响应头时无法取消，会占用线程直到超时
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix='llm')
+
+
+class Endpoint(NamedTuple):
+    name: str
+    url: str
+    model: str
+    headers: Dict[str, str] = {}
+
+
+class Completion(NamedTuple):
+    text: str
+    endpoint: str
+    # 首 token 耗时、总耗时 (秒)
+    ttft: float
+    elapsed: float
+    # 接口返回 usage 时为 completion_tokens，否则为流式数据块数
+    tokens: int
+    tokens_per_s: float
+
+
+class _Race:
+    """一次竞速的共享状态: 胜者、各端点的响应 (用于取消)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.changed = threading.Event()
+        self.winner: Optional[str] = None
+        self.cancelled = False
+        self.responses: Dict[str, object] = {}
+
+    def claim(self, name: str) -> bool:
+        """首 token 到达时调用，第一个调用者胜出并关闭其他端点"""
+        with self.lock:
+            if self.cancelled or (self.winner is not None and self.winner != name):
+                return False
+            first = self.winner is None
+            self.winner = name
+            losers = [(n, r) for n, r in self.responses.items() if n != name]
+        if first:
+            for loser, response in losers:
+                logger.debug(f"取消 {loser} (落后于 {name})")
+                _close(response)
+            self.changed.set()
+        return True
+
+    def register(self, name: str, response) -> bool:
+        """登记响应；已有其他胜者或已取消时返回 False"""
+        with self.lock:
+            if self.cancelled or (self.winner is not None and self.winner != name):
+                return False
+            self.responses[name] = response
+            return True
+
+    def lost(self, name: str) -> bool:
+        return self.cancelled or (self.winner is not None and self.winner != name)
+
+    def cancel(self):
+        with self.lock:
+            self.cancelled = True
+            responses = list(self.responses.values())
+        for response in responses:
+            _close(response)
+
+
+def _close(response):
+    """在后台关闭连接: 另一个线程正阻塞在读取上时 close 会等到读取返回"""
+    threading.Thread(target=response.close, daemon=True).start()
+
+
+def _delta_text(chunk: Dict) -> str:
+    choices = chunk.get('choices') or []
+    if not choices:
+        return ''
+    choice = choices[0]
+    # 流式为 delta，不支持流式的端点直接返回 message
+    content = (choice.get('delta') or choice.get('message') or {}).get('content')
+    return content or ''
+
+
+class LLMClient:
+    def __init__(self, endpoints: List[Endpoint], hedge_delay: float = HEDGE_DELAY,
+                 first_token_timeout: float = FIRST_TOKEN_TIMEOUT, total_timeout: float = TOTAL_TIMEOUT):
+        if not endpoints:
+            raise ValueError("至少需要一个端点")
+        if len({e.name for e in endpoints}) != len(endpoints):
+            raise ValueError("端点名称重复")
+        self.endpoints = endpoints
+        self.hedge_delay = hedge_delay
+        self.first_token_timeout = first_token_timeout
+        self.total_timeout = total_timeout
+
+    def _stream(self, endpoint: Endpoint, payload: Dict, race: _Race, start: float) -> Optional[Completion]:
+        """请求一个端点并读取 SSE 流；落败或被取消时返回 None"""
+        # 不经过域名限流: 挂起的请求会一直占用并发窗口，LLM 的并发由调用方控制
+        r = http_pool.session_for(endpoint.url).post(
+            endpoint.url,
+            json=dict(payload, model=endpoint.model, stream=True),
+            headers=endpoint.headers,
+            stream=True,
+            timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+        )
+        if not race.register(endpoint.name, r):
+            r.close()
+            return None
+        try:
+            if r.status_code != 200:
+                raise RuntimeError(f"HTTP {r.status_code}: {r.text[:200]}")
+
+            parts: List[str] = []
+            chunks = 0
+            usage_tokens = None
+            ttft = None
+
+            if 'text/event-stream' not in r.headers.get('Content-Type', ''):
+                # 端点忽略了 stream 参数，整体返回 JSON
+                lines = [b'data: ' + r.content]
+            else:
+                # chunk_size=None: 数据到达即处理，不等凑满缓冲区
+                lines = r.iter_lines(chunk_size=None)
+
+            for line in lines:
+                if race.lost(endpoint.name):
+                    return None
+                if not line.startswith(b'data:'):
+                    continue
+                data = line[5:].strip()
+                if data == b'[DONE]':
+                    break
+                chunk = json.loads(data)
+                if 'base_resp' in chunk and chunk['base_resp'].get('status_code'):
+                    raise RuntimeError(f"接口错误: {chunk['base_resp']}")
+                usage = chunk.get('usage') or {}
+                if usage.get('completion_tokens'):
+                    usage_tokens = usage['completion_tokens']
+
+                text = _delta_text(chunk)
+                if not text:
+                    continue
+                if ttft is None:
+                    if not race.claim(endpoint.name):
+                        return None
+                    ttft = time.monotonic() - start
+                parts.append(text)
+                chunks += 1
+        finally:
+            r.close()
+
+        if ttft is None:
+            raise RuntimeError("响应为空")
+        elapsed = time.monotonic() - start
+        tokens = usage_tokens or chunks
+        generating = elapsed - ttft
+        return Completion(
+            text=''.join(parts),
+            endpoint=endpoint.name,
+            ttft=ttft,
+            elapsed=elapsed,
+            tokens=tokens,
+            tokens_per_s=tokens / generating if generating > 0 else 0.0,
+        )
+
+    def _run(self, endpoint: Endpoint, payload: Dict, race: _Race, start: float) -> Optional[Completion]:
+        try:
+            return self._stream(endpoint, payload, race, start)
+        except Exception as e:
+            if not race.lost(endpoint.name):
+                logger.debug(f"{endpoint.name} 调用失败: {e}")
+            raise
+        finally:
+            race.changed.set()
+
+    def complete(self, messages: List[Dict], max_tokens: int = 2000,
+                 temperature: float = 0.3) -> Optional[Completion]:
+        """
+        竞速调用各端点，返回最先出首 token 的端点的完整输出
+
+        返回:
+            Completion；全部失败/超时返回 None
+        """
+        payload = {'messages': messages, 'max_tokens': max_tokens, 'temperature': temperature}
+        race = _Race()
+        start = time.monotonic()
+        futures: Dict[str, object] = {}
+        started = 0
+        next_start = start
+
+        while True:
+            now = time.monotonic()
+            if race.winner is not None:
+                break
+
+            running = [f for f in futures.values() if not f.done()]
+            if started < len(self.endpoints) and (now >= next_start or not running):
+                endpoint = self.endpoints[started]
+                started += 1
+                if running:
+                    logger.info(f"{now - start:.1f}s 未收到首token，同时请求 {endpoint.name}")
+                elif started > 1:
+                    logger.info(f"改用 {endpoint.name}")
+                futures[endpoint.name] = _executor.submit(self._run, endpoint, payload, race, start)
+                next_start = now + self.hedge_delay
+                continue
+            if not running:
+                logger.warning("全部 LLM 端点调用失败")
+                return None
+            if now - start >= self.first_token_timeout:
+                logger.warning(f"LLM 首 token 超时 ({self.first_token_timeout}s)")
+                race.cancel()
+                return None
+
+            race.changed.clear()
+            # clear 之后再检查一次，避免错过刚刚发生的变化
+            if race.winner is None and all(not f.done() for f in running):
+                wait_until = start + self.first_token_timeout
+                if started < len(self.endpoints):
+                    wait_until = min(wait_until, next_start)
+                race.changed.wait(max(0.0, wait_until - now))
+
+        winner = futures[race.winner]
+        try:
+            result = winner.result(timeout=max(0.0, start + self.total_timeout - time.monotonic()))
+        except Exception as e:
+            logger.warning(f"{race.winner} 输出中断: {e}")
+            race.cancel()
+            return None
+
+        logger.info(f"AI响应: {result.endpoint} 首token {result.ttft:.2f}s, 总耗时 {result.elapsed:.2f}s, "
+                    f"{result.tokens} tokens, {result.tokens_per_s:.1f} tokens/s")
+        return result
+
+
+if __name__ == '__main__':
+    gateway = os.environ.get('OPENCLAW_GATEWAY_URL', 'http://localhost:3333')
+    client = LLMClient([Endpoint('gateway', f"{gateway}/v1/chat/completions", 'minimax/MiniMax-M2.1')])
+    result = client.complete([{'role': 'user', 'content': ' '.join(sys.argv[1:]) or '你好'}], max_tokens=200)
+    print(result.text if result else '❌ 调用失败')
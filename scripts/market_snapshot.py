@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+全市场快照 - 覆盖全部A股(~5300只)
+数据来源: 东方财富(股票列表，按日缓存) + 腾讯批量行情(实时)
+
+功能:
+- 股票池每日只拉取一次，保存到本地
+- 全市场行情分块并发获取
+- 行情整理为 MarketTable，涨跌家数、涨停/跌停 (按板块计算涨跌停价)、炸板、连板、换手率分布、成交额均为数组运算
+"""
+
+import sys
+import os
+import json
+import time
+import http_pool
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+# 🚀 使用共享模块
+shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
+sys.path.insert(0, shared_dir)
+
+from logger import setup_logger
+from circuit_breaker import breaker
+from records import Quote
+from market_table import MarketTable
+from tencent_quote import fetch_quotes
+
+logger = setup_logger(__name__)
+
+DATA_DIR = os.path.expanduser("~/.openclaw/workspace/data/stock-sentiment-cn")
+UNIVERSE_FILE = os.path.join(DATA_DIR, 'universe.json')
+
+# 东方财富A股列表: 沪深主板 + 创业板 + 科创板 + 北交所
+UNIVERSE_URL = "http://push2.eastmoney.com/api/qt/clist/get"
+UNIVERSE_FS = "m:0+t:6,m:0+t:80,m:1+t:2,m:1+t:23,m:0+t:81+s:2048"
+UNIVERSE_PAGE_SIZE = 100
+
+# 全市场行情并发数
+SNAPSHOT_WORKERS = 16
+# 快照分块的失败不应让自选股行情 (tencent_quote) 熔断
+SNAPSHOT_BREAKER = 'tencent_snapshot'
+# 取到行情的股票占股票池的最低比例，低于该比例 (分块失败、中途熔断) 时涨跌家数不代表全市场，不使用快照
+MIN_COVERAGE = 0.9
+
+
+def _fetch_universe_page(page: int) -> Dict:
+    params = {
+        'pn': page,
+        'pz': UNIVERSE_PAGE_SIZE,
+        'po': 1,
+        'np': 1,
+        'fltt': 2,
+        'invt': 2,
+        'fid': 'f12',
+        'fs': UNIVERSE_FS,
+        'fields': 'f12,f14',
+    }
+    with breaker('eastmoney').guard():
+        r = http_pool.get(UNIVERSE_URL, params=params, timeout=10)
+        r.raise_for_status()
+        return r.json().get('data') or {}
+
+
+def fetch_universe() -> List[List[str]]:
+    """从东方财富获取全部A股 [[code, name], ...]，按页并发"""
+    first = _fetch_universe_page(1)
+    total = first.get('total', 0)
+    rows = list(first.get('diff') or [])
+    pages = -(-total // UNIVERSE_PAGE_SIZE)
+
+    if pages > 1:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for data in executor.map(_fetch_universe_page, range(2, pages + 1)):
+                rows.extend(data.get('diff') or [])
+
+    seen = set()
+    universe = []
+    for row in rows:
+        code = str(row.get('f12', ''))
+        if code and code not in seen:
+            seen.add(code)
+            universe.append([code, row.get('f14', '')])
+    return universe
+
+
+def load_universe() -> List[List[str]]:
+    """
+    读取股票池 - 当日缓存优先，过期则刷新；刷新失败时退回旧缓存
+    """
+    cached = None
+    if os.path.exists(UNIVERSE_FILE):
+        try:
+            with open(UNIVERSE_FILE, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached['updated_at'][:10] == datetime.now().strftime('%Y-%m-%d'):
+                return cached['stocks']
+        except Exception as e:
+            logger.debug(f"股票池缓存读取失败: {e}")
+
+    try:
+        stocks = fetch_universe()
+        if stocks:
+            os.makedirs(DATA_DIR, exist_ok=True)
+            with open(UNIVERSE_FILE, 'w', encoding='utf-8') as f:
+                json.dump({'updated_at': datetime.now().isoformat(), 'stocks': stocks}, f, ensure_ascii=False)
+            logger.info(f"股票池已更新: {len(stocks)}只")
+            return stocks
+    except Exception as e:
+        logger.warning(f"股票池刷新失败: {e}")
+
+    if cached:
+        logger.info("使用旧股票池缓存")
+        return cached.get('stocks', [])
+    return []
+
+
+def calc_breadth(quotes: Dict[str, Quote]) -> Dict:
+    """根据全市场行情计算涨跌家数、涨跌停、换手率分布"""
+    return MarketTable.from_quotes(quotes).breadth()
+
+
+def get_market_snapshot() -> Optional[Dict]:
+    """
+    全市场快照
+
+    返回:
+        {'up_count', 'down_count', 'flat_count', 'limit_up', 'limit_down', 'opened_up', 'opened_down',
+         'max_streak', 'multi_limit', 'streak_leaders', 'suspended', 'total', 'total_amount'(亿),
+         'turnover_dist', 'table', 'coverage', 'elapsed', 'source'}
+        table 为全市场 MarketTable，coverage 为取到行情的股票占股票池的比例
+        股票池不可用或 coverage 低于 MIN_COVERAGE 时返回 None
+    """
+    start = time.time()
+    universe = load_universe()
+    if not universe:
+        logger.warning("股票池为空，无法生成全市场快照")
+        return None
+
+    quotes = fetch_quotes([code for code, _ in universe], max_workers=SNAPSHOT_WORKERS,
+                          breaker_name=SNAPSHOT_BREAKER)
+    coverage = len(quotes) / len(universe)
+    if coverage < MIN_COVERAGE:
+        logger.warning(f"全市场快照只取到 {len(quotes)}/{len(universe)}只 ({coverage:.0%})，不使用")
+        return None
+
+    table = MarketTable.from_quotes(quotes)
+    result = table.breadth()
+    result.update(table.limit_streaks())
+    result['table'] = table
+    result['coverage'] = coverage
+    result['elapsed'] = time.time() - start
+    result['source'] = '腾讯行情(全市场快照)'
+
+    logger.info(f"全市场快照: {len(quotes)}/{len(universe)}只, 耗时 {result['elapsed']:.2f}s")
+    return result
+
+
+if __name__ == '__main__':
+    snapshot = get_market_snapshot()
+    if snapshot:
+        snapshot.pop('table')
+        print(json.dumps(snapshot, ensure_ascii=False, indent=2))
+    else:
+        print("❌ 全市场快照获取失败")
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+持久发送队列 (outbox) - SQLite
+
+报告生成后只写入队列就返回，由独立的后台进程 (drain) 投递:
+    - 每个渠道 (telegram / whatsapp ...) 一个工作线程，各渠道同时发送，同一渠道按入队顺序尝试
+    - 失败按指数退避重试 (BACKOFF_BASE × 2^n，最长 BACKOFF_MAX，±20% 抖动)，MAX_ATTEMPTS 次后标记为 failed；
+      HTTP 4xx (429 除外) 为请求本身的错误 (令牌失效、消息格式不被接受等)，重试无用，直接标记为 failed
+    - 幂等键: 同一渠道相同键的消息只入队一次，重复运行不会重复发送
+    - 发送前先占用租约 (LEASE 秒)，多个 drain 进程并存时同一条消息不会被同时发送；
+      进程中途退出时租约到期后由下一个 drain 接手
+    - 送达回执 (渠道返回的消息 ID 等)、送达时间、排队耗时记录在表中
+
+报告不会因为发送失败而丢失: 未送达的消息保留在队列中，下一次运行启动的 drain 会继续投递。
+
+用法:
+    outbox = open_outbox()
+    outbox.enqueue('telegram', report, key)
+    spawn_drain([script, '--drain'])                  # 后台进程中: drain(outbox, {'telegram': send_telegram})
+    python outbox.py                                  # 查看队列和最近回执
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+# 🚀 使用共享模块
+shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
+sys.path.insert(0, shared_dir)
+
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DATA_DIR = os.path.expanduser("~/.openclaw/workspace/data/stock-sentiment-cn")
+OUTBOX_DB = os.path.join(DATA_DIR, 'outbox.sqlite3')
+
+STATUS_PENDING = 'pending'
+STATUS_SENDING = 'sending'
+STATUS_SENT = 'sent'
+STATUS_FAILED = 'failed'
+
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 5
+BACKOFF_MAX = 300
+BACKOFF_JITTER = 0.2
+# 发送租约 (秒)，需大于单次发送的最长耗时
+LEASE = 120
+# 一个 drain 进程最长运行时间，之后剩余的消息留给下一次运行
+DRAIN_DEADLINE = 1800
+
+
+class Message(NamedTuple):
+    id: int
+    channel: str
+    key: str
+    body: str
+    attempts: int
+    created_at: float
+
+
+def content_key(body: str, scope: str = '') -> str:
+    """按内容生成幂等键；scope 区分允许重复发送相同内容的不同批次 (如日期)"""
+    digest = hashlib.sha256(body.encode('utf-8')).hexdigest()[:32]
+    return f"{scope}:{digest}" if scope else digest
+
+
+def is_permanent(error: BaseException) -> bool:
+    """HTTP 4xx (429 限流除外) 重试也不会成功"""
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return isinstance(status, int) and 400 <= status < 500 and status != 429
+
+
+def backoff(attempts: int) -> float:
+    """第 attempts 次失败后的等待时间 (秒)"""
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return delay * random.uniform(1 - BACKOFF_JITTER, 1 + BACKOFF_JITTER)
+
+
+class Outbox:
+    """发送队列；同一进程内的多个工作线程共享一个连接"""
+
+    def __init__(self, path: str = OUTBOX_DB, max_attempts: int = MAX_ATTEMPTS, lease: float = LEASE):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # isolation_level=None: 自己控制事务，占用消息用 BEGIN IMMEDIATE 保证跨进程互斥
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel TEXT NOT NULL,
+                key TEXT NOT NULL,
+                body TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                lease_until REAL NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                sent_at REAL,
+                receipt TEXT,
+                last_error TEXT,
+                UNIQUE (channel, key)
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(channel, status, next_attempt_at)')
+
+    def enqueue(self, channel: str, body: str, key: Optional[str] = None) -> Optional[int]:
+        """入队，返回消息 ID；相同 (channel, key) 已存在时不重复入队，返回 None"""
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                'INSERT OR IGNORE INTO outbox (channel, key, body, status, next_attempt_at, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (channel, key or content_key(body), body, STATUS_PENDING, now, now),
+            )
+        if not cur.rowcount:
+            logger.info(f"{channel} 已有相同消息 ({key})，不重复发送")
+            return None
+        return cur.lastrowid
+
+    def claim(self, channel: str) -> Optional[Message]:
+        """占用该渠道最早一条到期的消息 (含租约过期的 sending)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._conn.execute(
+                    'SELECT id, channel, key, body, attempts, created_at FROM outbox '
+                    'WHERE channel = ? AND ((status = ? AND next_attempt_at <= ?) OR (status = ? AND lease_until <= ?)) '
+                    'ORDER BY id LIMIT 1',
+                    (channel, STATUS_PENDING, now, STATUS_SENDING, now),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        'UPDATE outbox SET status = ?, lease_until = ? WHERE id = ?',
+                        (STATUS_SENDING, now + self.lease, row[0]),
+                    )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return Message(*row) if row else None
+
+    def ack(self, message: Message, receipt: Any = None):
+        """记录送达回执"""
+        with self._lock:
+            self._conn.execute(
+                'UPDATE outbox SET status = ?, sent_at = ?, receipt = ?, attempts = attempts + 1, last_error = NULL '
+                'WHERE id = ?',
+                (STATUS_SENT, time.time(), json.dumps(receipt, ensure_ascii=False, default=str), message.id),
+            )
+
+    def retry(self, message: Message, error: str, permanent: bool = False) -> bool:
+        """记录失败并安排重试；超过最大次数或 permanent 时标记为 failed 并返回 False"""
+        attempts = message.attempts + 1
+        give_up = permanent or attempts >= self.max_attempts
+        with self._lock:
+            self._conn.execute(
+                'UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, lease_until = 0, last_error = ? '
+                'WHERE id = ?',
+                (STATUS_FAILED if give_up else STATUS_PENDING, attempts,
+                 time.time() + (0 if give_up else backoff(attempts)), error[:500], message.id),
+            )
+        return not give_up
+
+    def next_due(self, channel: str) -> Optional[float]:
+        """
+        该渠道下一条待重试消息可发送的时间；没有时返回 None
+
+        不等待其他进程租约中的消息: 那个进程仍在发送，若它已退出，租约到期后由下一次 drain 接手
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT MIN(next_attempt_at) FROM outbox WHERE channel = ? AND status = ?',
+                (channel, STATUS_PENDING),
+            ).fetchone()
+        return row[0]
+
+    def channels(self) -> List[str]:
+        """有待发送消息的渠道"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT DISTINCT channel FROM outbox WHERE status IN (?, ?)', (STATUS_PENDING, STATUS_SENDING),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """{channel: {status: 条数}}"""
+        with self._lock:
+            rows = self._conn.execute('SELECT channel, status, COUNT(*) FROM outbox GROUP BY channel, status').fetchall()
+        result: Dict[str, Dict[str, int]] = {}
+        for channel, status, count in rows:
+            result.setdefault(channel, {})[status] = count
+        return result
+
+    def receipts(self, limit: int = 10) -> List[Dict]:
+        """最近的消息及回执 (新的在前)"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, channel, key, status, attempts, created_at, sent_at, receipt, last_error '
+                'FROM outbox ORDER BY id DESC LIMIT ?', (limit,),
+            ).fetchall()
+        fields = ('id', 'channel', 'key', 'status', 'attempts', 'created_at', 'sent_at', 'receipt', 'last_error')
+        return [dict(zip(fields, row)) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_outbox(path: str = OUTBOX_DB) -> Optional[Outbox]:
+    """打开发送队列，失败时返回 None (调用方退回直接发送)"""
+    try:
+        return Outbox(path)
+    except Exception as e:
+        logger.warning(f"发送队列不可用: {e}")
+        return None
+
+
+def _worker(outbox: Outbox, channel: str, send: Callable[[str], Any], stop_at: float) -> Dict[str, int]:
+    """单个渠道的发送循环: 逐条发送，等待重试时间，直到没有待发送消息或到达截止时间"""
+    sent = failed = 0
+    while time.time() < stop_at:
+        message = outbox.claim(channel)
+        if message is None:
+            wake = outbox.next_due(channel)
+            if wake is None or wake >= stop_at:
+                break
+            time.sleep(max(0.0, wake - time.time()) + 0.05)
+            continue
+
+        try:
+            receipt = send(message.body)
+        except Exception as e:
+            failed += 1
+            if outbox.retry(message, str(e), permanent=is_permanent(e)):
+                logger.warning(f"{channel} 发送失败 #{message.id} (第{message.attempts + 1}次，稍后重试): {e}")
+            else:
+                logger.error(f"{channel} 发送失败 #{message.id}，已放弃: {e}")
+            continue
+        outbox.ack(message, receipt)
+        sent += 1
+        logger.info(f"{channel} 送达 #{message.id} (入队后 {time.time() - message.created_at:.1f}s)")
+    return {'sent': sent, 'failed': failed}
+
+
+def drain(outbox: Outbox, senders: Dict[str, Callable[[str], Any]],
+          deadline: float = DRAIN_DEADLINE) -> Dict[str, Dict[str, int]]:
+    """
+    投递队列中的消息，各渠道并发
+
+    参数:
+        senders: {channel: send(body)}，send 返回回执 (可 JSON 序列化)，失败时抛出异常
+    返回:
+        {channel: {'sent': n, 'failed': n}}
+    """
+    channels = [c for c in outbox.channels() if c in senders]
+    unknown = set(outbox.channels()) - set(senders)
+    if unknown:
+        logger.warning(f"没有发送函数的渠道: {', '.join(sorted(unknown))}")
+    if not channels:
+        return {}
+
+    stop_at = time.time() + deadline
+    with ThreadPoolExecutor(max_workers=len(channels), thread_name_prefix='outbox') as executor:
+        futures = {c: executor.submit(_worker, outbox, c, senders[c], stop_at) for c in channels}
+        return {c: f.result() for c, f in futures.items()}
+
+
+def spawn_drain(argv: Sequence[str]) -> Optional[subprocess.Popen]:
+    """启动脱离当前进程的 drain 进程 (当前进程退出、终端关闭都不影响发送)"""
+    try:
+        return subprocess.Popen(
+            [sys.executable, *argv],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except Exception as e:
+        logger.error(f"后台发送进程启动失败: {e}")
+        return None
+
+
+if __name__ == '__main__':
+    outbox = open_outbox()
+    if outbox is None:
+        sys.exit(1)
+    for channel, counts in outbox.summary().items():
+        print(channel, counts)
+    for r in outbox.receipts(int(sys.argv[1]) if len(sys.argv) > 1 else 10):
+        created = time.strftime('%m-%d %H:%M:%S', time.localtime(r['created_at']))
+        latency = f"{r['sent_at'] - r['created_at']:.1f}s" if r['sent_at'] else '-'
+        print(f"#{r['id']} {r['channel']:<9} {r['status']:<8} {created} 次数{r['attempts']} 耗时{latency} "
+              f"{r['receipt'] or r['last_error'] or ''}")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+AI 提示词构建 - 紧凑表格 + token 预算
+
+市场状态序列化为 "|" 分隔的表格 (表头只写一次)，缺失的字段直接省略，不再输出 "N/A"。
+自选股按重要性排序后在 token 预算内截断，自选股再多，提示词长度也有上限:
+    重要性 = 涨跌幅 (相对本板块涨跌停幅度) + RSI 偏离中性区的程度 + 乖离率 + 趋势是否反转 + 涨跌停
+重要性低于 MIN_MATERIALITY 的股票视为波动较小，不列出；其余超出预算的股票因长度省略。
+两类未列出的股票各汇总成一行 (只数、平均涨跌幅)。
+
+token 数为估算值: 中日韩字符按 1 个 token，其他字符按 CHARS_PER_TOKEN 个字符 1 个 token。
+
+用法:
+    prompt = build_prompt(template, market_data, indices, watchlist, sectors, budget=800)
+    prompt.text, prompt.tokens, prompt.omitted
+"""
+
+import math
+import re
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from records import Quote, SectorFlow, WatchStock
+from market_table import MarketTable
+
+PROMPT_TOKEN_BUDGET = 800
+# 预算不足时也至少列出的自选股数
+MIN_STOCKS = 3
+# 低于该重要性的自选股视为波动较小，不逐行列出 (约为涨跌幅不到涨跌停幅度的 1/10 且无其他信号)
+MIN_MATERIALITY = 0.1
+MAX_SECTORS = 5
+CHARS_PER_TOKEN = 3.5
+
+# 重要性权重
+W_CHANGE = 1.0
+W_RSI = 0.6
+W_BIAS = 0.4
+W_TREND = 0.8
+W_LIMIT = 0.5
+
+_CJK_RE = re.compile(r'[\u3000-\u303f\u4e00-\u9fff\uff00-\uffef]')
+
+
+class Prompt(NamedTuple):
+    text: str
+    tokens: int
+    # 列出的自选股代码 (按重要性降序) 与未列出的只数
+    stocks: List[str]
+    omitted: int
+
+
+def estimate_tokens(text: str) -> int:
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / CHARS_PER_TOKEN)
+
+
+def _fmt(value: Any, spec: str = '') -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    return format(value, spec) if spec else str(value)
+
+
+def format_table(header: Sequence[str], rows: Sequence[Sequence[str]]) -> List[str]:
+    """"|" 分隔的表格，所有行都为空的列整列省略"""
+    keep = [i for i in range(len(header)) if any(row[i] for row in rows)]
+    lines = ['|'.join(header[i] for i in keep)]
+    lines.extend('|'.join(row[i] or '-' for i in keep) for row in rows)
+    return lines
+
+
+def _column(stocks: Sequence[WatchStock], name: str, default: float = np.nan) -> np.ndarray:
+    return np.array([getattr(s, name) if getattr(s, name) is not None else default for s in stocks],
+                    dtype=np.float64)
+
+
+def materiality(stocks: Sequence[WatchStock]) -> np.ndarray:
+    """自选股重要性得分 (越大越值得写进提示词)"""
+    if not stocks:
+        return np.zeros(0)
+    table = MarketTable.from_quotes(stocks)
+    flags = table.flags()
+    limit_pct = np.nan_to_num(table['limit_rate'], nan=0.1) * 100
+
+    rsi = np.nan_to_num(_column(stocks, 'rsi'), nan=50.0)
+    bias5 = np.nan_to_num(_column(stocks, 'bias5'), nan=0.0)
+    trends = np.array([s.trend or '' for s in stocks])
+    prev_trends = np.array([s.prev_trend or '' for s in stocks])
+
+    return (
+        W_CHANGE * np.abs(table['change']) / limit_pct
+        # RSI 进入 70/30 之外才开始计分，到 100/0 时为 1
+        + W_RSI * np.clip(np.abs(rsi - 50) - 20, 0, None) / 30
+        + W_BIAS * np.clip(np.abs(bias5) - 5, 0, None) / 5
+        + W_TREND * ((trends != prev_trends) & (prev_trends != ''))
+        + W_LIMIT * (flags['at_limit_up'] | flags['at_limit_down'] | flags['opened_up'])
+    )
+
+
+def _market_line(market_data: dict) -> Optional[str]:
+    fields = (
+        ('上涨', 'up_count', ''), ('下跌', 'down_count', ''), ('涨停', 'limit_up', ''),
+        ('跌停', 'limit_down', ''), ('炸板', 'opened_up', ''), ('最高连板', 'max_streak', ''),
+        ('成交额(亿)', 'total_amount', '.0f'),
+    )
+    parts = [f"{label}{_fmt(market_data.get(key), spec)}" for label, key, spec in fields
+             if market_data.get(key) is not None]
+    return f"市场: {' '.join(parts)}" if parts else None
+
+
+def _stock_row(s: WatchStock) -> List[str]:
+    trend = s.trend or ''
+    if s.prev_trend and s.prev_trend != trend:
+        trend = f"{s.prev_trend}→{trend}"
+    return [s.name, s.code, _fmt(s.change, '+.2f'), trend, _fmt(s.rsi, '.0f'), _fmt(s.bias5, '+.1f'),
+            s.sector or '']
+
+
+STOCK_HEADER = ('自选股', '代码', '涨跌%', '趋势', 'RSI', '乖离%', '板块')
+REST_LINE_TOKENS = estimate_tokens("(另有100只自选股因长度省略，平均+0.00%)")
+
+
+def _rest_line(stocks: Sequence[WatchStock], reason: str) -> str:
+    avg = sum(s.change for s in stocks) / len(stocks)
+    return f"(另有{len(stocks)}只自选股{reason}，平均{avg:+.2f}%)"
+
+
+def stock_table(stocks: Sequence[WatchStock]) -> List[str]:
+    return format_table(STOCK_HEADER, [_stock_row(s) for s in stocks])
+
+
+def build_summary(market_data: dict, indices: Sequence[Quote], watchlist: Sequence[WatchStock],
+                  sectors: Sequence[SectorFlow], budget: int = PROMPT_TOKEN_BUDGET,
+                  reserved: int = 0) -> Prompt:
+    """
+    市场摘要 (不含模板)
+
+    参数:
+        budget: 摘要 + reserved 的 token 上限
+        reserved: 模板等固定部分占用的 token
+    """
+    lines: List[str] = []
+    if indices:
+        lines += format_table(('指数', '点位', '涨跌%'),
+                              [[i.name, _fmt(i.price, '.2f'), _fmt(i.change, '+.2f')] for i in indices])
+    market = _market_line(market_data)
+    if market:
+        lines.append(market)
+    if sectors:
+        lines += format_table(('资金流入板块', '涨跌%', '净流入亿'),
+                              [[s.name, _fmt(s.change, '+.2f'), _fmt(s.net, '.1f')] for s in sectors[:MAX_SECTORS]])
+
+    scores = materiality(watchlist)
+    order = np.argsort(-scores, kind='stable')
+    ranked = [watchlist[i] for i in order]
+    # 重要性降序，达到 MIN_MATERIALITY 的是前缀 (至少保留 MIN_STOCKS 只)
+    material = max(int(np.count_nonzero(scores >= MIN_MATERIALITY)), min(MIN_STOCKS, len(ranked)))
+    quiet = ranked[material:]
+    quiet_line = _rest_line(quiet, '波动较小未列出') if quiet else None
+    rows = [_stock_row(s) for s in ranked[:material]]
+
+    # 按重要性逐行加入，直到超出预算 (给未列出汇总行留出位置)
+    used = reserved + estimate_tokens('\n'.join(lines + ['|'.join(STOCK_HEADER)])) + REST_LINE_TOKENS
+    if quiet_line:
+        used += estimate_tokens(quiet_line) + 1
+    count = 0
+    for row in rows:
+        used += estimate_tokens('|'.join(row)) + 1
+        if count >= MIN_STOCKS and used > budget:
+            break
+        count += 1
+    if rows:
+        lines += stock_table(ranked[:count])
+    truncated = ranked[count:material]
+    if truncated:
+        lines.append(_rest_line(truncated, '因长度省略'))
+    if quiet_line:
+        lines.append(quiet_line)
+
+    text = '\n'.join(lines)
+    return Prompt(text, estimate_tokens(text), [s.code for s in ranked[:count]], len(ranked) - count)
+
+
+def build_prompt(template: str, market_data: dict, indices: Sequence[Quote],
+                 watchlist: Sequence[WatchStock], sectors: Sequence[SectorFlow],
+                 budget: int = PROMPT_TOKEN_BUDGET) -> Prompt:
+    """把摘要填入模板的 {summary}，tokens 为完整提示词的估算值"""
+    reserved = estimate_tokens(template.replace('{summary}', ''))
+    summary = build_summary(market_data, indices, watchlist, sectors, budget, reserved)
+    text = template.format(summary=summary.text)
+    return summary._replace(text=text, tokens=estimate_tokens(text))
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+按域名的限流器 - 令牌桶 + AIMD 自适应并发窗口
+
+- 令牌桶: 限制每秒请求数 (rate)，允许 burst 个突发
+- 并发窗口: 成功时加性增长 (每个窗口的成功 +1)，遇到 429/5xx/超时时减半
+  上游健康时自动跑满，上游限流时自动退让，不再需要手工调的 sleep
+
+用法:
+    limiter = limiter_for('qt.gtimg.cn')
+    with limiter.slot() as slot:
+        r = session.get(...)
+        slot.record(r.status_code)
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional, Tuple
+
+# 域名 -> (每秒请求数, 突发量, 最大并发窗口, 初始并发窗口)
+# qt.gtimg.cn: 一次全市场快照约 90 块 + 自选股/指数，突发量容纳整次快照，
+# 初始窗口即快照并发数 (每个进程只跑一次快照，从 2 慢慢增长来不及)；被限流时 AIMD 仍会减半
+HOST_RATES: Dict[str, Tuple[float, int, int, int]] = {
+    'qt.gtimg.cn': (100, 120, 16, 16),
+    'web.ifzq.gtimg.cn': (20, 10, 8, 2),
+    'push2.eastmoney.com': (10, 5, 4, 2),
+    'data.10jqka.com.cn': (2, 2, 2, 2),
+}
+DEFAULT_RATE = (10, 5, 4, 2)
+
+INITIAL_WINDOW = 2
+MIN_WINDOW = 1
+# 两次减半的最小间隔，避免同一批失败把窗口连续砍到底
+DECREASE_COOLDOWN = 1.0
+
+THROTTLE_STATUS = (429, 500, 502, 503, 504)
+
+
+class HostLimiter:
+    """单个域名的令牌桶 + AIMD 并发窗口 (线程安全，同时支持 asyncio)"""
+
+    def __init__(self, rate: float, burst: int, max_window: int,
+                 initial_window: float = INITIAL_WINDOW, min_window: int = MIN_WINDOW):
+        self.rate = rate
+        self.burst = burst
+        self.max_window = max_window
+        self.min_window = min_window
+        self.window = float(min(initial_window, max_window))
+
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._in_flight = 0
+        self._decreased_at = 0.0
+        self._cond = threading.Condition()
+
+        self.successes = 0
+        self.throttles = 0
+
+    def _try_acquire(self) -> float:
+        """调用方需持有锁。成功返回 0，否则返回建议等待秒数"""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+        if self._in_flight >= int(self.window):
+            return 0.05
+        if self._tokens < 1:
+            return (1 - self._tokens) / self.rate
+        self._tokens -= 1
+        self._in_flight += 1
+        return 0.0
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0:
+                    return True
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                self._cond.wait(wait)
+
+    async def acquire_async(self):
+        while True:
+            with self._cond:
+                wait = self._try_acquire()
+            if wait == 0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, throttled: bool = False):
+        """释放并发名额并调整窗口: 成功加性增长，被限流/出错减半"""
+        with self._cond:
+            self._in_flight -= 1
+            if throttled:
+                self.throttles += 1
+                now = time.monotonic()
+                if now - self._decreased_at >= DECREASE_COOLDOWN:
+                    self.window = max(self.min_window, self.window / 2)
+                    self._decreased_at = now
+            else:
+                self.successes += 1
+                self.window = min(self.max_window, self.window + 1 / self.window)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        slot = _Slot()
+        try:
+            yield slot
+        except Exception as e:
+            slot.throttled = slot.throttled or _is_throttle_error(e)
+            raise
+        finally:
+            self.release(slot.throttled)
+
+    @asynccontextmanager
+    async def slot_async(self):
+        await self.acquire_async()
+        slot = _Slot()
+        try:
+            yield slot
+        except Exception as e:
+            slot.throttled = slot.throttled or _is_throttle_error(e)
+            raise
+        finally:
+            self.release(slot.throttled)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                'window': round(self.window, 2),
+                'in_flight': self._in_flight,
+                'successes': self.successes,
+                'throttles': self.throttles,
+            }
+
+
+class _Slot:
+    """一次请求的结果登记"""
+
+    __slots__ = ('throttled',)
+
+    def __init__(self):
+        self.throttled = False
+
+    def record(self, status: int):
+        if status in THROTTLE_STATUS:
+            self.throttled = True
+
+
+def _is_throttle_error(error: Exception) -> bool:
+    """超时、连接失败视为上游过载"""
+    name = type(error).__name__
+    return isinstance(error, (TimeoutError, ConnectionError, asyncio.TimeoutError)) or \
+        'Timeout' in name or 'ConnectionError' in name or 'ClientConnector' in name
+
+
+_limiters: Dict[str, HostLimiter] = {}
+_lock = threading.Lock()
+
+
+def limiter_for(host: str) -> HostLimiter:
+    limiter = _limiters.get(host)
+    if limiter is None:
+        with _lock:
+            limiter = _limiters.get(host)
+            if limiter is None:
+                rate, burst, max_window, initial_window = HOST_RATES.get(host, DEFAULT_RATE)
+                limiter = _limiters[host] = HostLimiter(rate, burst, max_window, initial_window)
+    return limiter
+
+
+def all_stats() -> Dict[str, Dict]:
+    return {host: limiter.stats() for host, limiter in list(_limiters.items())}
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+行情/资金数据记录类型
+
+用 __slots__ 代替每行一个 dict: 全市场盘中跟踪时对象数量以百万计，
+slots 对象没有 __dict__，内存不到同字段 dict 的 40% (行情 18 字段: 约 185 vs 470 字节)。
+
+兼容字典访问 (record['price']、record.get('pe')、'ma5' in record)，
+已有按键取值的代码不需要一次性全部改写；值为 None 的字段视为不存在。
+
+JSON:
+    record.to_dict() / Quote.from_dict(d)
+    json.dumps(data, default=to_jsonable)
+"""
+
+import json
+from typing import Any, Dict, Iterator, Tuple
+
+
+class Record:
+    """slots 记录基类，子类只需定义 __slots__ (新增字段，按继承顺序排在父类字段之后)"""
+
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = cls._fields + tuple(cls.__dict__.get('__slots__', ()))
+
+    def __init__(self, *args, **kwargs):
+        fields = self._fields
+        if len(args) > len(fields):
+            raise TypeError(f"{type(self).__name__} 最多 {len(fields)} 个字段")
+        for name, value in zip(fields, args):
+            object.__setattr__(self, name, value)
+        for name in fields[len(args):]:
+            object.__setattr__(self, name, kwargs.pop(name, None))
+        if kwargs:
+            raise TypeError(f"{type(self).__name__} 没有字段: {', '.join(kwargs)}")
+
+    # ---- 字典兼容 ----
+
+    def __getitem__(self, key: str) -> Any:
+        value = getattr(self, key) if key in self._fields else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self._fields:
+            raise KeyError(f"{type(self).__name__} 没有字段: {key}")
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._fields and getattr(self, key) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None) if key in self._fields else None
+        return default if value is None else value
+
+    def keys(self) -> Iterator[str]:
+        return (name for name in self._fields if getattr(self, name) is not None)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return ((name, getattr(self, name)) for name in self.keys())
+
+    def update(self, other=(), **kwargs):
+        items = other.items() if hasattr(other, 'items') else other
+        for key, value in items:
+            self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    # ---- 转换 ----
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Record':
+        """未知键忽略"""
+        return cls(**{k: v for k, v in data.items() if k in cls._fields})
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> 'Record':
+        return cls.from_dict(json.loads(text))
+
+    def replace(self, **changes) -> 'Record':
+        values = {name: getattr(self, name) for name in self._fields}
+        values.update(changes)
+        return type(self)(**values)
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and all(
+            getattr(self, n) == getattr(other, n) for n in self._fields)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        body = ', '.join(f"{k}={v!r}" for k, v in self.items())
+        return f"{type(self).__name__}({body})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, n) for n in self._fields)
+
+    def __setstate__(self, state):
+        for name, value in zip(self._fields, state):
+            object.__setattr__(self, name, value)
+
+
+class Quote(Record):
+    """实时行情 (腾讯字段口径: 成交量-手，成交额-万元，市值-亿元)"""
+
+    __slots__ = (
+        'code', 'name', 'price', 'pre_close', 'open', 'high', 'low', 'change', 'time',
+        'volume', 'amount', 'turnover', 'pe', 'pb', 'market_cap', 'limit_up', 'limit_down',
+        'source',
+    )
+
+
+class WatchStock(Quote):
+    """自选股: 行情 + 技术指标 (prev_trend 为上一交易日趋势) + 所属板块"""
+
+    __slots__ = (
+        'ma5', 'ma10', 'ma20', 'bias5', 'rsi', 'support', 'resistance', 'trend', 'prev_trend', 'sector',
+    )
+
+
+class Bar(Record):
+    """日线 (date 为 yyyymmdd 整数)"""
+
+    __slots__ = ('date', 'open', 'close', 'high', 'low', 'volume')
+
+
+class SectorFlow(Record):
+    """概念/行业资金流向 (金额单位: 亿)"""
+
+    __slots__ = (
+        'rank', 'name', 'index', 'change', 'inflow', 'outflow', 'net',
+        'companies', 'leader', 'leader_change', 'leader_price',
+    )
+
+
+class StockFlow(Record):
+    """个股资金流向 (金额单位: 万元)"""
+
+    __slots__ = (
+        'rank', 'code', 'name', 'price', 'change', 'turnover',
+        'inflow', 'outflow', 'net', 'amount',
+    )
+
+
+class LonghuEntry(Record):
+    """龙虎榜个股"""
+
+    __slots__ = ('rank', 'code', 'name', 'change')
+
+
+def to_jsonable(obj: Any) -> Any:
+    """json.dumps 的 default 参数"""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"{type(obj).__name__} 无法序列化为 JSON")
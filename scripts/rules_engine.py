@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+规则引擎 - 声明式规则，整表向量化求值
+
+规则定义在 JSON 文件中 (默认 rules.json，可用配置 rules_file 指定)，按用途分节，每条规则:
+    id        唯一标识，命中次数按 id 统计
+    group     同组规则按顺序互斥，每行取第一条命中的规则 (等价于 if/elif/else，"True" 作为 else)
+    when      条件表达式，列名为变量，例如 "abs(price - support) / price < 0.02"
+              支持 + - * /、比较 (可连写)、and/or/not、in (...)、abs/min/max/isnan
+    label     短标签 (选股器输出)
+    severity  positive / info / warning / negative
+    message   消息模板，{列名} 按该行的值格式化，例如 "RSI超买 ({rsi:.1f})"
+
+表达式在加载时编译为 NumPy 运算，一次求值覆盖整张表 (全市场 5000 只在毫秒级)；
+引用不存在的列、不支持的语法在加载时报错，不会等到盘中运行才发现。
+
+用法:
+    rules = load_rules()
+    hits = rules['checklist'].evaluate(stock_frame(table, watchlist))
+    hits.counts()            # {rule_id: 命中数}
+    hits.messages(0)         # 第 0 行命中的消息
+    table[hits.mask('rsi_overbought')]
+"""
+
+import sys
+import os
+import ast
+import json
+import operator
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+# 🚀 使用共享模块
+shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
+sys.path.insert(0, shared_dir)
+
+from logger import setup_logger
+from limit_price import FLAG_DTYPE
+from market_table import MarketTable, DTYPE
+
+logger = setup_logger(__name__)
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules.json')
+
+SEVERITIES = ('positive', 'info', 'warning', 'negative')
+
+# 技术指标列: 行情表没有这些列，由自选股记录提供；缺失时取默认值 (与原 checklist 的默认一致)
+TECH_DEFAULTS = {
+    'rsi': 50.0,
+    'bias5': 0.0,
+    'ma5': np.nan,
+    'ma10': np.nan,
+    'ma20': np.nan,
+    'trend': '未知',
+    'prev_trend': '',
+}
+# 支撑/压力位缺失时取现价 ×(1 ∓ LEVEL_DEFAULT)
+LEVEL_DEFAULT = 0.05
+
+STOCK_COLUMNS = frozenset(DTYPE.names) | frozenset(FLAG_DTYPE.names) | frozenset(TECH_DEFAULTS) | \
+    {'limit_pct', 'support', 'resistance'}
+PORTFOLIO_COLUMNS = frozenset({
+    'count', 'up_count', 'down_count', 'avg_change', 'strong_count', 'weak_count', 'avg_idx_change',
+})
+# 节名 -> 可用列，未列出的节按个股规则处理
+SECTION_COLUMNS = {'portfolio': PORTFOLIO_COLUMNS}
+
+_COMPARE = {
+    ast.Gt: operator.gt, ast.GtE: operator.ge, ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+}
+_BINARY = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+_FUNCTIONS = {'abs': np.abs, 'min': np.minimum, 'max': np.maximum, 'isnan': np.isnan}
+
+Frame = Mapping[str, np.ndarray]
+
+
+def _compile(node: ast.AST, columns: frozenset) -> Callable[[Frame], Any]:
+    """表达式语法树 -> frame 上的 NumPy 运算"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (bool, int, float, str)):
+        value = node.value
+        return lambda frame: value
+    if isinstance(node, ast.Name):
+        name = node.id
+        if name not in columns:
+            raise ValueError(f"未知列: {name}")
+        return lambda frame: frame[name]
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile(v, columns) for v in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        return lambda frame: combine.reduce([np.asarray(p(frame), dtype=bool) for p in parts])
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        inner = _compile(node.operand, columns)
+        return lambda frame: ~np.asarray(inner(frame), dtype=bool)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        inner = _compile(node.operand, columns)
+        return lambda frame: -inner(frame)
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        op = _BINARY[type(node.op)]
+        left, right = _compile(node.left, columns), _compile(node.right, columns)
+        return lambda frame: op(left(frame), right(frame))
+    if isinstance(node, ast.Compare):
+        return _compile_compare(node, columns)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS \
+            and not node.keywords:
+        func = _FUNCTIONS[node.func.id]
+        args = [_compile(a, columns) for a in node.args]
+        return lambda frame: func(*(a(frame) for a in args))
+    raise ValueError(f"不支持的表达式: {ast.dump(node)[:80]}")
+
+
+def _compile_compare(node: ast.Compare, columns: frozenset) -> Callable[[Frame], Any]:
+    """a < b <= c -> (a < b) & (b <= c)；x in ('A', 'B') -> np.isin"""
+    operands = [_compile(node.left, columns)]
+    steps = []
+    for op, comparator in zip(node.ops, node.comparators):
+        if isinstance(op, (ast.In, ast.NotIn)):
+            if not isinstance(comparator, (ast.Tuple, ast.List)) or \
+                    not all(isinstance(e, ast.Constant) for e in comparator.elts):
+                raise ValueError("in 右侧只能是常量列表")
+            values = [e.value for e in comparator.elts]
+            invert = isinstance(op, ast.NotIn)
+            steps.append(lambda a, b, values=values, invert=invert: np.isin(a, values, invert=invert))
+            operands.append(lambda frame: None)
+        elif type(op) in _COMPARE:
+            steps.append(_COMPARE[type(op)])
+            operands.append(_compile(comparator, columns))
+        else:
+            raise ValueError(f"不支持的比较: {type(op).__name__}")
+
+    def compare(frame):
+        values = [o(frame) for o in operands]
+        result = True
+        for i, step in enumerate(steps):
+            result = np.logical_and(result, step(values[i], values[i + 1]))
+        return result
+    return compare
+
+
+def compile_condition(expr: str, columns: frozenset = STOCK_COLUMNS) -> Callable[[Frame], np.ndarray]:
+    """条件表达式 -> predicate(frame)，返回与表等长的布尔数组 (NaN 参与的比较为 False)"""
+    try:
+        body = _compile(ast.parse(expr.strip(), mode='eval').body, columns)
+    except SyntaxError as e:
+        raise ValueError(f"表达式语法错误: {expr}") from e
+
+    def predicate(frame: Frame) -> np.ndarray:
+        n = len(next(iter(frame.values())))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = np.asarray(body(frame), dtype=bool)
+        return np.broadcast_to(result, (n,))
+    return predicate
+
+
+class Rule(NamedTuple):
+    id: str
+    group: str
+    when: str
+    label: str
+    severity: str
+    message: str
+    predicate: Callable[[Frame], np.ndarray]
+
+
+def _row_values(frame: Frame, i: int) -> Dict[str, Any]:
+    return {name: column[i].item() if hasattr(column[i], 'item') else column[i]
+            for name, column in frame.items()}
+
+
+class RuleHits:
+    """一次求值的结果: hits[r, i] 表示第 r 条规则命中第 i 行"""
+
+    def __init__(self, rules: Sequence[Rule], hits: np.ndarray, frame: Frame):
+        self.rules = rules
+        self.hits = hits
+        self.frame = frame
+        self._index = {rule.id: r for r, rule in enumerate(rules)}
+
+    def __len__(self) -> int:
+        return self.hits.shape[1]
+
+    def mask(self, rule_id: str) -> np.ndarray:
+        return self.hits[self._index[rule_id]]
+
+    def counts(self) -> Dict[str, int]:
+        """{rule_id: 命中行数}"""
+        totals = self.hits.sum(axis=1)
+        return {rule.id: int(n) for rule, n in zip(self.rules, totals)}
+
+    def _matched(self, i: int, group: Optional[str]) -> List[Rule]:
+        return [rule for r, rule in enumerate(self.rules)
+                if self.hits[r, i] and (group is None or rule.group == group)]
+
+    def labels(self, i: int, group: Optional[str] = None) -> List[str]:
+        return [rule.label for rule in self._matched(i, group)]
+
+    def messages(self, i: int, group: Optional[str] = None, **context) -> List[str]:
+        """第 i 行命中规则的消息 (规则文件中的顺序)；context 提供行以外的模板变量"""
+        rules = self._matched(i, group)
+        if not rules:
+            return []
+        values = dict(_row_values(self.frame, i), **context)
+        return [rule.message.format(**values) for rule in rules]
+
+
+class RuleSet:
+    def __init__(self, rules: Sequence[Rule]):
+        ids = [rule.id for rule in rules]
+        if len(set(ids)) != len(ids):
+            raise ValueError("规则 id 重复")
+        self.rules = list(rules)
+
+    @classmethod
+    def from_specs(cls, specs: Sequence[Mapping], columns: frozenset = STOCK_COLUMNS) -> 'RuleSet':
+        rules = []
+        for spec in specs:
+            rule_id = spec.get('id', '?')
+            try:
+                severity = spec.get('severity', 'info')
+                if severity not in SEVERITIES:
+                    raise ValueError(f"未知 severity: {severity}")
+                rules.append(Rule(
+                    id=spec['id'],
+                    group=spec.get('group') or spec['id'],
+                    when=spec['when'],
+                    label=spec.get('label', spec['id']),
+                    severity=severity,
+                    message=spec.get('message', spec.get('label', spec['id'])),
+                    predicate=compile_condition(spec['when'], columns),
+                ))
+            except (KeyError, ValueError) as e:
+                raise ValueError(f"规则 {rule_id} 无效: {e}") from e
+        return cls(rules)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def evaluate(self, frame: Frame) -> RuleHits:
+        """整表求值；同组规则按顺序互斥"""
+        n = len(next(iter(frame.values()))) if frame else 0
+        hits = np.zeros((len(self.rules), n), dtype=bool)
+        taken: Dict[str, np.ndarray] = {}
+        for r, rule in enumerate(self.rules):
+            group_taken = taken.setdefault(rule.group, np.zeros(n, dtype=bool))
+            hits[r] = rule.predicate(frame) & ~group_taken
+            group_taken |= hits[r]
+        return RuleHits(self.rules, hits, frame)
+
+
+def load_rules(path: str = RULES_FILE) -> Dict[str, RuleSet]:
+    """加载规则文件 -> {节名: RuleSet}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {
+        section: RuleSet.from_specs(specs, SECTION_COLUMNS.get(section, STOCK_COLUMNS))
+        for section, specs in data.items() if not section.startswith('_')
+    }
+
+
+def stock_frame(table: MarketTable, stocks: Optional[Sequence] = None) -> Dict[str, np.ndarray]:
+    """
+    个股规则的列: 行情表全部列 + 涨跌停标记 + limit_pct (涨跌幅限制 %，无限制按 10%) + 技术指标
+
+    参数:
+        stocks: 与 table 行对应的自选股记录 (提供技术指标)；全市场选股时为 None，指标取默认值
+    """
+    frame = {name: table[name] for name in DTYPE.names}
+    flags = table.flags()
+    frame.update({name: flags[name] for name in FLAG_DTYPE.names})
+    frame['limit_pct'] = np.nan_to_num(table['limit_rate'], nan=0.1) * 100
+
+    n = len(table)
+    for name, default in TECH_DEFAULTS.items():
+        values = [default] * n if stocks is None else \
+            [default if s.get(name) is None else s.get(name) for s in stocks]
+        frame[name] = np.array(values, dtype=str if isinstance(default, str) else np.float64)
+
+    price = table['price']
+    for name, sign in (('support', -1), ('resistance', 1)):
+        default = price * (1 + sign * LEVEL_DEFAULT)
+        if stocks is None:
+            frame[name] = default
+        else:
+            given = np.array([np.nan if s.get(name) is None else s.get(name) for s in stocks], dtype=np.float64)
+            frame[name] = np.where(np.isnan(given), default, given)
+    return frame
+
+
+if __name__ == '__main__':
+    # 全市场选股: 对每条个股规则统计命中数
+    import time
+    from market_snapshot import get_market_snapshot
+
+    rules = load_rules(sys.argv[1] if len(sys.argv) > 1 else RULES_FILE)
+    snapshot = get_market_snapshot()
+    if not snapshot:
+        print('❌ 全市场行情获取失败')
+        sys.exit(1)
+    table = snapshot['table']
+    table = table[table.active]
+    start = time.perf_counter()
+    frame = stock_frame(table)
+    results = {section: rule_set.evaluate(frame) for section, rule_set in rules.items()
+               if section not in SECTION_COLUMNS}
+    print(f"{table} 规则求值 {(time.perf_counter() - start) * 1000:.2f}ms")
+    for section, hits in results.items():
+        print(f"[{section}]")
+        for rule in hits.rules:
+            mask = hits.mask(rule.id)
+            print(f"  {rule.id:<16} {int(mask.sum()):>5}  {', '.join(table[mask].topk('change', 5).names())}")
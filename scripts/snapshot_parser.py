@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+浏览器快照解析 - 单遍流式
+
+快照 (aria / text 格式) 每行一个节点，缩进表示层级:
+    - table:
+      - row:
+        - cell "1"
+        - cell "半导体"
+        ...
+    - row "1 半导体 1000.00 2.50% ..."        (text 格式，一行一条记录)
+
+按行扫描一次，根据缩进判断行边界，不依赖固定的单元格步长:
+某一行缺少/多出单元格只影响该行，不会让后面所有行错位。
+所有函数都是生成器，大表 (数千行) 不需要先把全部单元格放进列表。
+"""
+
+import re
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# 缩进、角色、可选的带引号名称 (名称内可能有转义引号)
+_NODE_RE = re.compile(r'^(\s*)(?:- )?([A-Za-z][\w-]*)(?: "((?:[^"\\]|\\.)*)")?')
+
+CELL_ROLES = frozenset(('cell', 'gridcell', 'rowheader'))
+HEADER_ROLES = frozenset(('columnheader',))
+
+
+class Node(NamedTuple):
+    depth: int
+    role: str
+    name: str
+
+
+class Row(NamedTuple):
+    """表格的一行: 单元格文本、单元格内的链接文本、是否表头"""
+    cells: Tuple[str, ...]
+    links: Tuple[str, ...]
+    header: bool
+
+
+def iter_nodes(lines: Iterable[str]) -> Iterator[Node]:
+    """逐行解析节点，无法识别的行跳过"""
+    if isinstance(lines, str):
+        lines = lines.splitlines()
+    match = _NODE_RE.match
+    for line in lines:
+        m = match(line)
+        if m:
+            name = m.group(3)
+            yield Node(len(m.group(1)), m.group(2), name.replace('\\"', '"') if name else '')
+
+
+def iter_static_texts(text: str) -> Iterator[str]:
+    for node in iter_nodes(text):
+        if node.role == 'StaticText' and node.name:
+            yield node.name
+
+
+def iter_rows(text: str) -> Iterator[Row]:
+    """
+    按行产出表格行
+
+    aria 格式: row 节点下缩进更深的 cell 节点为该行单元格，遇到缩进不深于 row 的节点时该行结束
+    text 格式: row 节点自带名称且没有子单元格，名称按空白切分为单元格
+    """
+    row_depth = -1
+    row_name = ''
+    cells: List[str] = []
+    links: List[str] = []
+    header = False
+
+    def flush() -> Optional[Row]:
+        if cells:
+            return Row(tuple(cells), tuple(links), header)
+        if row_name:
+            return Row(tuple(row_name.split()), (), False)
+        return None
+
+    for node in iter_nodes(text):
+        if row_depth >= 0 and node.depth <= row_depth:
+            row = flush()
+            if row:
+                yield row
+            row_depth = -1
+
+        if node.role == 'row':
+            row_depth, row_name, header = node.depth, node.name, False
+            cells, links = [], []
+        elif row_depth >= 0:
+            if node.role in CELL_ROLES:
+                cells.append(node.name)
+            elif node.role in HEADER_ROLES:
+                cells.append(node.name)
+                header = True
+            elif node.role == 'link' and node.name:
+                links.append(node.name)
+
+    if row_depth >= 0:
+        row = flush()
+        if row:
+            yield row
+
+
+def iter_cell_links(text: str) -> Iterator[Tuple[str, str]]:
+    """产出 (单元格文本, 单元格内第一个链接文本)，用于 "名称 涨跌幅%" + 链接 这类排版"""
+    cell_depth = -1
+    cell_name = ''
+    for node in iter_nodes(text):
+        if cell_depth >= 0 and node.depth <= cell_depth:
+            cell_depth = -1
+        if node.role in CELL_ROLES:
+            cell_depth, cell_name = node.depth, node.name
+        elif node.role == 'link' and cell_depth >= 0 and node.name:
+            yield cell_name, node.name
+            cell_depth = -1
+
+
+# ============ 单元格转换 ============
+
+def to_int(text: str) -> int:
+    return int(text.replace(',', ''))
+
+
+def to_float(text: str) -> float:
+    return float(text.replace(',', ''))
+
+
+def to_pct(text: str) -> float:
+    return float(text.replace('%', '').replace(',', ''))
+
+
+Column = Tuple[int, str, Callable[[str], object]]
+
+
+def parse_table(text: str, columns: Sequence[Column], record: Callable[..., Any] = dict) -> Iterator[Any]:
+    """
+    按列定义转换数据行，表头行和转换失败的行跳过
+
+    参数:
+        columns: [(列序号, 字段名, 转换函数), ...]
+        record: 行类型，以字段名关键字参数构造 (默认 dict，可传 records 中的记录类)
+    """
+    width = max(i for i, _, _ in columns) + 1
+    for row in iter_rows(text):
+        if row.header or len(row.cells) < width:
+            continue
+        try:
+            values = {field: convert(row.cells[i]) for i, field, convert in columns}
+        except (ValueError, TypeError):
+            continue
+        yield record(**values)
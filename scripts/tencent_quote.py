@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+腾讯行情批量接口
+qt.gtimg.cn 支持一次查询多个代码: q=sh600000,sz000001,...
+
+功能:
+- 代码自动补全市场前缀 (sh/sz/bj)
+- 按URL安全长度分块，多块并发请求（共用 http_pool 连接池）
+- 解析响应中的每一行 v_xxx="..."
+"""
+
+import sys
+import os
+import re
+import http_pool
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+# 🚀 使用共享模块
+shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
+sys.path.insert(0, shared_dir)
+
+from logger import setup_logger
+from circuit_breaker import breaker, CircuitOpenError
+from records import Quote
+
+logger = setup_logger(__name__)
+
+QUOTE_URL = "http://qt.gtimg.cn/q="
+
+# 每块代码数 - 60个代码约540字符，远低于URL长度限制
+CHUNK_SIZE = 60
+MAX_WORKERS = 8
+
+# 自选股/指数行情的熔断器名 (同步和异步采集共用)；全市场快照用单独的熔断器，互不影响
+BREAKER = 'tencent_quote'
+
+# 响应格式: v_sh600000="1~浦发银行~600000~10.50~...";
+_LINE_RE = re.compile(r'v_(\w+)="([^"]*)"')
+
+
+# 北交所代码前缀 (920xxx 为北交所新代码段，须先于沪市 9 开头判断)，limit_price.board_of 共用
+BSE_PREFIXES = ('92', '4', '8')
+
+
+def to_symbol(code: str) -> str:
+    """股票代码补全市场前缀，已带前缀的原样返回"""
+    code = code.strip().lower()
+    if code[:2] in ('sh', 'sz', 'bj'):
+        return code
+    if code.startswith(BSE_PREFIXES):
+        return f"bj{code}"
+    if code.startswith(('6', '9')):
+        return f"sh{code}"
+    return f"sz{code}"
+
+
+def _to_float(value: str) -> float:
+    try:
+        return float(value) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+def parse_quote_fields(fields: List[str]) -> Optional[Quote]:
+    """解析单个代码的 ~ 分隔字段"""
+    if len(fields) <= 45:
+        return None
+    try:
+        return Quote(
+            code=fields[2],
+            name=fields[1],
+            price=float(fields[3]),
+            pre_close=float(fields[4]),
+            open=float(fields[5]),
+            high=float(fields[33]),
+            low=float(fields[34]),
+            change=float(fields[32]),
+            time=fields[30],
+            volume=int(float(fields[36] or 0)),
+            amount=_to_float(fields[37]),
+            turnover=_to_float(fields[38]),
+            pe=_to_float(fields[39]),
+            pb=_to_float(fields[46]) if len(fields) > 46 else 0,
+            market_cap=_to_float(fields[44]),
+            limit_up=_to_float(fields[47]) if len(fields) > 47 else 0,
+            limit_down=_to_float(fields[48]) if len(fields) > 48 else 0,
+        )
+    except (ValueError, IndexError):
+        return None
+
+
+def parse_quotes(text: str) -> Dict[str, Quote]:
+    """解析批量响应，返回 {symbol: quote}，无效代码(v_pv_none_match)自动跳过"""
+    quotes = {}
+    for symbol, body in _LINE_RE.findall(text):
+        quote = parse_quote_fields(body.split('~'))
+        if quote:
+            quotes[symbol] = quote
+    return quotes
+
+
+def _chunks(items: List[str], size: int) -> Iterable[List[str]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _fetch_chunk(symbols: List[str], breaker_name: str = BREAKER) -> Dict[str, Quote]:
+    try:
+        with breaker(breaker_name).guard():
+            r = http_pool.get(QUOTE_URL + ','.join(symbols), timeout=5)
+            r.raise_for_status()
+            r.encoding = 'gbk'
+            return parse_quotes(r.text)
+    except CircuitOpenError:
+        return {}
+    except Exception as e:
+        logger.warning(f"批量行情获取失败 ({len(symbols)}只, {symbols[0]}...): {e}")
+        return {}
+
+
+def fetch_quotes(codes: Iterable[str], chunk_size: int = CHUNK_SIZE,
+                 max_workers: int = MAX_WORKERS, breaker_name: str = BREAKER) -> Dict[str, Quote]:
+    """
+    批量获取实时行情
+
+    参数:
+        codes: 股票/指数代码，可带或不带市场前缀
+        breaker_name: 计入的熔断器
+    返回:
+        {symbol: quote}，symbol 为带前缀代码 (如 sh600000)；失败的块不影响其他块
+    """
+    symbols = list(dict.fromkeys(to_symbol(c) for c in codes))
+    if not symbols:
+        return {}
+
+    chunks = list(_chunks(symbols, chunk_size))
+    if len(chunks) == 1:
+        return _fetch_chunk(chunks[0], breaker_name)
+
+    quotes = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        for result in executor.map(lambda chunk: _fetch_chunk(chunk, breaker_name), chunks):
+            quotes.update(result)
+    return quotes
+
+
+if __name__ == '__main__':
+    import json
+    import time
+    from records import to_jsonable
+
+    start = time.time()
+    result = fetch_quotes(sys.argv[1:] or ['sh000001', '600118', '300456'])
+    print(json.dumps(result, ensure_ascii=False, indent=2, default=to_jsonable))
+    print(f"✅ {len(result)}只, 耗时 {time.time() - start:.3f}s")
@@ -1,13 +1,72 @@
 #!/usr/bin/env python3
 """
 同花顺资金流向数据获取接口
-支持：概念资金、行业资金
+支持：概念资金、行业资金、个股资金
+
+表格分页: 第1页带有 page_info ("1/7")，其余页通过 ajax 分页地址并发获取，合并去重后缓存。
+概念/行业表格取全部分页 (几页)。个股表格约 100 页，按 2 次/秒的限速要近一分钟，
+只需要净额排行时按净额排序取两端: 降序、升序各 STOCK_NET_PAGES 页 (净流入、净流出前列)；
+返回的页面不是按净额排序时 (排序字段失效) 退回获取全部分页。
+缓存默认只在内存中；报告脚本传入自己的 TTLCache，与其他数据共用同一个磁盘缓存。
 """
 
-import requests
+import sys
+import os
 import re
+import http_pool
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
+
+# 🚀 使用共享模块
+shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
+sys.path.insert(0, shared_dir)
+
+from ttl_cache import TTLCache
+from trading_calendar import cache_ttl
+from records import SectorFlow, StockFlow, to_jsonable
+
+# 完整表格缓存时间 (秒)，休市期间延长到下次开盘
+FUNDS_TTL = 300
+MAX_WORKERS = 4
+# 个股表格按净额排序的字段，及降序/升序各取的页数 (每页 50 只)
+STOCK_NET_FIELD = 'zjjlr'
+STOCK_NET_PAGES = 2
+
+# 未传入缓存时使用 (独立运行)
+_cache = TTLCache(max_entries=16, default_ttl=FUNDS_TTL)
+
+_PAGE_INFO_RE = re.compile(r'class="page_info">\s*\d+\s*/\s*(\d+)')
+_ROW_RE = re.compile(r'<tr[^>]*>(.*?)</tr>', re.S)
+_CELL_RE = re.compile(r'<td[^>]*>(.*?)</td>', re.S)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def _iter_html_rows(html: str):
+    """逐行产出 <td> 文本 (去掉标签)，表头行 (<th>) 没有 <td> 自动跳过"""
+    for row in _ROW_RE.finditer(html):
+        cells = [_TAG_RE.sub('', c).strip() for c in _CELL_RE.findall(row.group(1))]
+        if cells:
+            yield cells
+
+
+def _pct(text: str) -> float:
+    return float(text.replace('%', ''))
+
+
+def _page_path(path: str, field: str, order: str, page: int) -> str:
+    return f"{path}field/{field}/order/{order}/page/{page}/ajax/1/free/1/"
+
+
+def _amount_wan(text: str) -> float:
+    """'1.23亿' / '4567.8万' / '12345' (元) -> 万元"""
+    text = text.strip()
+    if text.endswith('亿'):
+        return float(text[:-1]) * 10000
+    if text.endswith('万'):
+        return float(text[:-1])
+    return float(text) / 10000
+
 
 class TonghuaShunDataAPI:
     """同花顺数据接口"""
@@ -17,114 +76,214 @@ class TonghuaShunDataAPI:
     # 编码方式
     ENCODING = 'gbk'
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'zh-CN,zh;q=0.8,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        })
+    # 表格类型 -> (路径, 默认排序字段)
+    TABLES = {
+        'concept': ('/funds/gnzjl/', 'tradezdf'),
+        'industry': ('/funds/hyzjl/', 'tradezdf'),
+        'stock': ('/funds/ggzjl/', 'zdf'),
+    }
+    
+    # 按请求传入，不修改共享连接池中的 Session
+    HEADERS = {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'zh-CN,zh;q=0.8,en;q=0.5',
+    }
+    
+    def __init__(self, cache: Optional[TTLCache] = None):
+        self.cache = cache if cache is not None else _cache
     
     def _fetch_page(self, path: str) -> Optional[str]:
         """获取页面内容"""
         try:
             url = f"{self.BASE_URL}{path}"
-            r = self.session.get(url, timeout=15)
+            r = http_pool.get(url, headers=self.HEADERS, timeout=15)
+            r.raise_for_status()
             r.encoding = self.ENCODING
             return r.text
         except Exception as e:
             print(f"❌ 获取失败: {e}")
             return None
     
-    def _parse_table(self, html: str) -> List[Dict]:
-        """解析资金流向表格"""
-        items = []
-        
-        # 匹配表格行: 排名 概念名 指数 涨幅 流入 流出 净额 公司数 领涨股 涨幅 现价
-        pattern = r'''(\d+)\s+<a[^>]*>([^<]+)</a>\s+([\d.]+)\s+([+-]?[\d.]+)%\s+([\d.]+)\s+([\d.]+)\s+([+-]?[\d.]+)\s+(\d+)\s+<a[^>]*>([^<]+)</a>\s+([+-]?[\d.]+)%\s+([\d.]+)'''
+    def _fetch_pages(self, paths: List[str]) -> List[str]:
+        """并发获取 (请求速率由 http_pool 的域名限流器控制)，失败的页跳过"""
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            return [html for html in executor.map(self._fetch_page, paths) if html]
+    
+    def _fetch_all_pages(self, kind: str) -> List[str]:
+        """第1页取总页数，其余页并发获取"""
+        path, field = self.TABLES[kind]
+        first = self._fetch_page(path)
+        if not first:
+            return []
         
-        matches = re.findall(pattern, html)
+        match = _PAGE_INFO_RE.search(first)
+        pages = int(match.group(1)) if match else 1
+        if pages <= 1:
+            return [first]
         
-        for match in matches:
+        paths = [_page_path(path, field, 'desc', p) for p in range(2, pages + 1)]
+        rest = self._fetch_pages(paths)
+        if len(rest) < len(paths):
+            print(f"⚠️ {kind} 分页缺失 {len(paths) - len(rest)}/{pages} 页")
+        return [first] + rest
+    
+    def _fetch_stock_net_pages(self) -> Optional[List[str]]:
+        """
+        个股表格按净额降序、升序各取 STOCK_NET_PAGES 页 (净流入、净流出两端)
+
+        页面不是按净额排序时返回 None (只检查页内顺序，翻页期间排名变动会打乱跨页顺序)
+        """
+        path, _ = self.TABLES['stock']
+        pages = {
+            order: self._fetch_pages([_page_path(path, STOCK_NET_FIELD, order, p)
+                                      for p in range(1, STOCK_NET_PAGES + 1)])
+            for order in ('desc', 'asc')
+        }
+        for order, htmls in pages.items():
+            if not htmls:
+                return None
+            for html in htmls:
+                nets = [item.net for item in self._parse_stock_table(html)]
+                if not nets or nets != sorted(nets, reverse=order == 'desc'):
+                    return None
+        return pages['desc'] + pages['asc']
+    
+    def _parse_table(self, html: str) -> List[SectorFlow]:
+        """解析概念/行业资金流向表格: 排名 名称 指数 涨幅 流入 流出 净额 公司数 领涨股 涨幅 现价"""
+        items = []
+        for cells in _iter_html_rows(html):
+            if len(cells) < 11:
+                continue
             try:
-                items.append({
-                    'rank': int(match[0]),
-                    'name': match[1].strip(),
-                    'index': float(match[2]),
-                    'change': float(match[3]),
-                    'inflow': float(match[4]),
-                    'outflow': float(match[5]),
-                    'net': float(match[6]),
-                    'companies': int(match[7]),
-                    'leader': match[8],
-                    'leader_change': float(match[9]),
-                    'leader_price': float(match[10]),
-                })
-            except:
+                items.append(SectorFlow(
+                    rank=int(cells[0]),
+                    name=cells[1],
+                    index=float(cells[2]),
+                    change=_pct(cells[3]),
+                    inflow=float(cells[4]),
+                    outflow=float(cells[5]),
+                    net=float(cells[6]),
+                    companies=int(cells[7]),
+                    leader=cells[8],
+                    leader_change=_pct(cells[9]),
+                    leader_price=float(cells[10]),
+                ))
+            except ValueError:
                 continue
         
         return items
     
-    def get_concept_funds(self) -> Dict:
+    def _parse_stock_table(self, html: str) -> List[StockFlow]:
+        """解析个股资金流向表格: 序号 代码 名称 现价 涨跌幅 换手率 流入 流出 净额 成交额 (金额为万元)"""
+        items = []
+        for cells in _iter_html_rows(html):
+            if len(cells) < 10:
+                continue
+            try:
+                items.append(StockFlow(
+                    rank=int(cells[0]),
+                    code=cells[1],
+                    name=cells[2],
+                    price=float(cells[3]),
+                    change=_pct(cells[4]),
+                    turnover=_pct(cells[5]),
+                    inflow=_amount_wan(cells[6]),
+                    outflow=_amount_wan(cells[7]),
+                    net=_amount_wan(cells[8]),
+                    amount=_amount_wan(cells[9]),
+                ))
+            except ValueError:
+                continue
+        return items
+    
+    def get_table(self, kind: str) -> List:
         """
-        获取概念资金流向
+        获取表格 (分页合并去重)，结果缓存
         
-        返回:
-        {
-            'update_time': str,
-            'source': str,
-            'top_gainers': [...],
-            'top_losers': [...],
-            'all': [...]
-        }
+        参数:
+            kind: concept / industry / stock (个股只有净额排行两端，见 _fetch_stock_net_pages)
         """
-        print("📊 获取概念资金流向...")
-        html = self._fetch_page('/funds/gnzjl/')
+        parse: Callable[[str], List] = self._parse_stock_table if kind == 'stock' else self._parse_table
+        key = 'code' if kind == 'stock' else 'name'
         
-        if not html:
-            return {'error': '获取失败'}
+        def load():
+            htmls = self._fetch_stock_net_pages() if kind == 'stock' else None
+            if htmls is None:
+                if kind == 'stock':
+                    print(f"⚠️ 个股表格未按 {STOCK_NET_FIELD} 排序，获取全部分页")
+                htmls = self._fetch_all_pages(kind)
+            seen = set()
+            items = []
+            for html in htmls:
+                for item in parse(html):
+                    # 翻页期间排名变动会导致同一条目出现在相邻两页
+                    if getattr(item, key) not in seen:
+                        seen.add(getattr(item, key))
+                        items.append(item)
+            return items or None
         
-        items = self._parse_table(html)
+        return self.cache.get_or_load(f"ths_table_{kind}", load, ttl=cache_ttl(FUNDS_TTL)) or []
+    
+    def _ranked(self, kind: str, type_name: str) -> Dict:
+        items = self.get_table(kind)
+        if not items:
+            return {'error': '获取失败'}
         
         # 分离涨跌
-        gainers = [i for i in items if i['change'] > 0]
-        losers = [i for i in items if i['change'] < 0]
+        gainers = [i for i in items if i.change > 0]
+        losers = [i for i in items if i.change < 0]
         
         return {
             'update_time': datetime.now().strftime('%Y-%m-%d %H:%M'),
             'source': '同花顺',
-            'type': '概念资金',
+            'type': type_name,
             'total_items': len(items),
-            'top_gainers': sorted(gainers, key=lambda x: x['change'], reverse=True)[:10],
-            'top_losers': sorted(losers, key=lambda x: x['change'])[:10],
+            'top_gainers': sorted(gainers, key=lambda x: x.change, reverse=True)[:10],
+            'top_losers': sorted(losers, key=lambda x: x.change)[:10],
             'all': items,
         }
     
+    def get_concept_funds(self) -> Dict:
+        """
+        获取概念资金流向 (全部分页)
+        
+        返回:
+        {
+            'update_time': str,
+            'source': str,
+            'top_gainers': [...],
+            'top_losers': [...],
+            'all': [...]
+        }
+        """
+        print("📊 获取概念资金流向...")
+        return self._ranked('concept', '概念资金')
+    
     def get_industry_funds(self) -> Dict:
         """
-        获取行业资金流向
+        获取行业资金流向 (全部分页)
         """
         print("📊 获取行业资金流向...")
-        html = self._fetch_page('/funds/hyzjl/')
-        
-        if not html:
+        return self._ranked('industry', '行业资金')
+    
+    def get_stock_funds(self, limit: int = 50) -> Dict:
+        """
+        获取个股资金净流入、净流出排行 (各前 limit 只，limit 不超过 STOCK_NET_PAGES × 50)
+
+        all 只包含净额两端的个股，不是全部个股
+        """
+        print("📊 获取个股资金流向...")
+        items = self.get_table('stock')
+        if not items:
             return {'error': '获取失败'}
         
-        items = self._parse_table(html)
-        
-        # 分离涨跌
-        gainers = [i for i in items if i['change'] > 0]
-        losers = [i for i in items if i['change'] < 0]
-        
         return {
             'update_time': datetime.now().strftime('%Y-%m-%d %H:%M'),
             'source': '同花顺',
-            'type': '行业资金',
+            'type': '个股资金',
             'total_items': len(items),
-            'top_gainers': sorted(gainers, key=lambda x: x['change'], reverse=True)[:10],
-            'top_losers': sorted(losers, key=lambda x: x['change'])[:10],
+            'top_net_inflow': sorted([i for i in items if i.net > 0], key=lambda x: x.net, reverse=True)[:limit],
+            'top_net_outflow': sorted([i for i in items if i.net < 0], key=lambda x: x.net)[:limit],
             'all': items,
         }
 
@@ -192,7 +351,7 @@ def main():
     # 保存概念数据
     import json
     with open('/tmp/concept_funds.json', 'w', encoding='utf-8') as f:
-        json.dump(concept_data, f, ensure_ascii=False, indent=2)
+        json.dump(concept_data, f, ensure_ascii=False, indent=2, default=to_jsonable)
     
     # 获取行业资金
     print("\n" + "="*50)
@@ -202,7 +361,7 @@ def main():
     
     # 保存行业数据
     with open('/tmp/industry_funds.json', 'w', encoding='utf-8') as f:
-        json.dump(industry_data, f, ensure_ascii=False, indent=2)
+        json.dump(industry_data, f, ensure_ascii=False, indent=2, default=to_jsonable)
     
     print("\n" + "="*50)
     print("✅ 数据已保存到 /tmp/concept_funds.json 和 /tmp/industry_funds.json")
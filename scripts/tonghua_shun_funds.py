@@ -4,7 +4,6 @@
 支持：概念资金、行业资金、个股资金、龙虎榜、营业部排名
 """
 
-import subprocess
 import json
 import re
 import sys
@@ -12,17 +11,52 @@ import os
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from circuit_breaker import CircuitOpenError
+from browser_pool import pool, table_ready
+from snapshot_parser import iter_cell_links, parse_table, to_float, to_int, to_pct
+from records import LonghuEntry, SectorFlow, StockFlow, to_jsonable
+
+CONCEPT_URL = 'https://data.10jqka.com.cn/funds/gnzjl/'
+INDUSTRY_URL = 'https://data.10jqka.com.cn/funds/hyzjl/'
+STOCK_URL = 'https://data.10jqka.com.cn/funds/ggzjl/'
+LONGHU_URL = 'https://data.10jqka.com.cn/market/longhu/'
+
+# 概念/行业表: 序号 名称 指数 涨跌幅 流入 流出 净额 公司数 领涨股 ...
+FUNDS_COLUMNS = (
+    (0, 'rank', to_int),
+    (1, 'name', str),
+    (2, 'index', to_float),
+    (3, 'change', to_pct),
+    (4, 'inflow', to_float),
+    (5, 'outflow', to_float),
+    (6, 'net', to_float),
+)
+
+
+_CHANGE_SUFFIX_RE = re.compile(r'([+-]?\d+\.?\d*)%$')
+_LONGHU_CELL_RE = re.compile(r'cell "[^"]+%"')
+
+
+def longhu_ready(text: str) -> bool:
+    """龙虎榜没有序号列，以出现 股票名+涨跌幅 单元格为准"""
+    return bool(_LONGHU_CELL_RE.search(text))
+
+
 class TonghuaShunAPI:
     """同花顺数据 API"""
     
-    def get_browser_snapshot(self, url: str) -> Optional[str]:
+    def __init__(self):
+        # get_all 并行预取的快照 {url: text}
+        self._prefetched: Dict[str, Optional[str]] = {}
+    
+    def get_browser_snapshot(self, url: str, ready=table_ready) -> Optional[str]:
+        if url in self._prefetched:
+            return self._prefetched.pop(url)
         try:
-            subprocess.run(['openclaw', 'browser', 'open', url], capture_output=True, timeout=30)
-            result = subprocess.run(
-                ['openclaw', 'browser', 'snapshot', '--format', 'aria'],
-                capture_output=True, text=True, timeout=60
-            )
-            return result.stdout if result.returncode == 0 else None
+            return pool.snapshot(url, ready=ready)
+        except CircuitOpenError as e:
+            print(f"⏭️ {e}，跳过: {url}")
+            return None
         except Exception as e:
             print(f"❌ Browser获取失败: {e}")
             return None
@@ -44,35 +78,15 @@ class TonghuaShunAPI:
     # ============ 概念资金 ============
     def get_concept_funds(self) -> Dict:
         print("📊 获取概念资金流向...")
-        snapshot = self.get_browser_snapshot('https://data.10jqka.com.cn/funds/gnzjl/')
+        snapshot = self.get_browser_snapshot(CONCEPT_URL)
         if not snapshot:
             return {'error': '获取失败'}
         
-        # 解析表格格式: cell "序号", cell "名称", cell "涨跌幅", cell "净额", etc.
-        cells = re.findall(r'                    - cell "([^"]+)"\n', snapshot)
-        
-        items = []
-        # 每12个cell为一行数据
-        for i in range(0, min(len(cells) - 11, 200), 12):
-            try:
-                rank = int(cells[i])
-                name = cells[i + 1]
-                index_val = float(cells[i + 2])
-                change = float(cells[i + 3].replace('%', ''))
-                inflow = float(cells[i + 4])
-                outflow = float(cells[i + 5])
-                net = float(cells[i + 6])
-                
-                items.append({
-                    'rank': rank, 'name': name,
-                    'index': index_val, 'change': change,
-                    'inflow': inflow, 'outflow': outflow, 'net': net
-                })
-            except (ValueError, IndexError):
-                continue
+        # 按表格行解析: 序号 名称 指数 涨跌幅 流入 流出 净额 ...
+        items = list(parse_table(snapshot, FUNDS_COLUMNS, SectorFlow))
         
-        gainers = sorted([i for i in items if i['change'] > 0], key=lambda x: x['change'], reverse=True)[:10]
-        losers = sorted([i for i in items if i['change'] < 0], key=lambda x: x['change'])[:10]
+        gainers = sorted([i for i in items if i.change > 0], key=lambda x: x.change, reverse=True)[:10]
+        losers = sorted([i for i in items if i.change < 0], key=lambda x: x.change)[:10]
         
         return {
             'update_time': datetime.now().strftime('%Y-%m-%d %H:%M'), 'source': '同花顺',
@@ -83,34 +97,14 @@ class TonghuaShunAPI:
     # ============ 行业资金 ============
     def get_industry_funds(self) -> Dict:
         print("📊 获取行业资金流向...")
-        snapshot = self.get_browser_snapshot('https://data.10jqka.com.cn/funds/hyzjl/')
+        snapshot = self.get_browser_snapshot(INDUSTRY_URL)
         if not snapshot:
             return {'error': '获取失败'}
         
-        # 解析表格格式
-        cells = re.findall(r'                    - cell "([^"]+)"\n', snapshot)
+        items = list(parse_table(snapshot, FUNDS_COLUMNS, SectorFlow))
         
-        items = []
-        for i in range(0, min(len(cells) - 11, 200), 12):
-            try:
-                rank = int(cells[i])
-                name = cells[i + 1]
-                index_val = float(cells[i + 2])
-                change = float(cells[i + 3].replace('%', ''))
-                inflow = float(cells[i + 4])
-                outflow = float(cells[i + 5])
-                net = float(cells[i + 6])
-                
-                items.append({
-                    'rank': rank, 'name': name,
-                    'index': index_val, 'change': change,
-                    'inflow': inflow, 'outflow': outflow, 'net': net
-                })
-            except (ValueError, IndexError):
-                continue
-        
-        gainers = sorted([i for i in items if i['change'] > 0], key=lambda x: x['change'], reverse=True)[:10]
-        losers = sorted([i for i in items if i['change'] < 0], key=lambda x: x['change'])[:10]
+        gainers = sorted([i for i in items if i.change > 0], key=lambda x: x.change, reverse=True)[:10]
+        losers = sorted([i for i in items if i.change < 0], key=lambda x: x.change)[:10]
         
         return {
             'update_time': datetime.now().strftime('%Y-%m-%d %H:%M'), 'source': '同花顺',
@@ -121,35 +115,23 @@ class TonghuaShunAPI:
     # ============ 个股资金 ============
     def get_stock_funds(self, limit: int = 50) -> Dict:
         print("📊 获取个股资金流向...")
-        snapshot = self.get_browser_snapshot('https://data.10jqka.com.cn/funds/ggzjl/')
+        snapshot = self.get_browser_snapshot(STOCK_URL)
         if not snapshot:
             return {'error': '获取失败'}
         
-        # 解析个股资金表格
-        cells = re.findall(r'                    - cell "([^"]+)"\n', snapshot)
-        
-        items = []
-        # 每行约10个cell: 序号,代码,名称,现价,涨跌幅,涨跌额,成交额,流入,流出,净额
-        for i in range(0, min(len(cells) - 9, 500), 10):
-            try:
-                rank = int(cells[i])
-                code = cells[i + 1]
-                name = cells[i + 2]
-                price = float(cells[i + 3])
-                change = float(cells[i + 4].replace('%', ''))
-                # 净额带单位，需要转换
-                net_str = cells[i + 9]
-                net = self.parse_amount(net_str)
-                
-                items.append({
-                    'rank': rank, 'code': code, 'name': name,
-                    'price': price, 'change': change, 'net': net
-                })
-            except (ValueError, IndexError):
-                continue
+        # 个股资金表格: 序号,代码,名称,现价,涨跌幅,涨跌额,成交额,流入,流出,净额
+        items = list(parse_table(snapshot, (
+            (0, 'rank', to_int),
+            (1, 'code', str),
+            (2, 'name', str),
+            (3, 'price', to_float),
+            (4, 'change', to_pct),
+            # 净额带单位，需要转换
+            (9, 'net', self.parse_amount),
+        ), StockFlow))
         
-        net_gainers = sorted([i for i in items if i['net'] > 0], key=lambda x: x['net'], reverse=True)[:limit]
-        net_losers = sorted([i for i in items if i['net'] < 0], key=lambda x: x['net'])[:limit]
+        net_gainers = sorted([i for i in items if i.net > 0], key=lambda x: x.net, reverse=True)[:limit]
+        net_losers = sorted([i for i in items if i.net < 0], key=lambda x: x.net)[:limit]
         
         return {
             'update_time': datetime.now().strftime('%Y-%m-%d %H:%M'), 'source': '同花顺',
@@ -160,41 +142,29 @@ class TonghuaShunAPI:
     # ============ 龙虎榜个股明细 ============
     def get_longhu_detail(self) -> Dict:
         print("📊 获取龙虎榜个股明细...")
-        snapshot = self.get_browser_snapshot('https://data.10jqka.com.cn/market/longhu/')
+        snapshot = self.get_browser_snapshot(LONGHU_URL, ready=longhu_ready)
         if not snapshot:
             return {'error': '获取失败'}
         
-        items = []
-        # 解析深市和沪市的龙虎榜数据
-        # 格式: cell "股票名 涨跌幅%"
-        pattern = r'cell "([^"]+)"\s*\n\s*- link "([^"]+)"'
-        for match in re.finditer(pattern, snapshot):
-            try:
-                full_text = match.group(1)
-                name = match.group(2)
-                # 提取涨跌幅
-                change_match = re.search(r'([+-]?\d+\.?\d*)%$', full_text)
-                if change_match:
-                    change = float(change_match.group(1))
-                    items.append({
-                        'name': name,
-                        'change': change,
-                    })
-            except:
-                pass
-        
-        # 过滤并去重
+        # 解析深市和沪市的龙虎榜数据 (同一只股票可能同时上多个榜单，去重)
+        # 格式: cell "股票名 涨跌幅%" 下挂 link "股票名"
         seen = set()
         unique_items = []
-        for item in items:
-            if item['name'] not in seen:
-                seen.add(item['name'])
-                unique_items.append(item)
+        for full_text, name in iter_cell_links(snapshot):
+            # 提取涨跌幅
+            change_match = _CHANGE_SUFFIX_RE.search(full_text)
+            if change_match and name not in seen:
+                seen.add(name)
+                unique_items.append(LonghuEntry(
+                    rank=len(unique_items) + 1,
+                    name=name,
+                    change=float(change_match.group(1)),
+                ))
         
         return {
             'update_time': datetime.now().strftime('%Y-%m-%d %H:%M'), 'source': '同花顺',
             'type': '龙虎榜个股明细', 'total': len(unique_items),
-            'items': [{'rank': i+1, **item} for i, item in enumerate(unique_items[:50])],
+            'items': unique_items[:50],
         }
     
     # ============ 龙虎榜全部 ============
@@ -206,6 +176,12 @@ class TonghuaShunAPI:
     
     # ============ 全部数据 ============
     def get_all(self) -> Dict:
+        # 四个页面在不同标签页并行加载
+        print("📊 并行加载同花顺页面...")
+        self._prefetched.update(pool.snapshot_many(
+            [CONCEPT_URL, INDUSTRY_URL, STOCK_URL, LONGHU_URL],
+            ready={LONGHU_URL: longhu_ready},
+        ))
         return {
             'update_time': datetime.now().strftime('%Y-%m-%d %H:%M'),
             'concept': self.get_concept_funds(),
@@ -284,28 +260,28 @@ def main():
         data = api.get_concept_funds()
         print(format_output(data, 'concept'))
         with open('/tmp/concept_funds.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            json.dump(data, f, ensure_ascii=False, indent=2, default=to_jsonable)
         print("\n✅ 已保存到 /tmp/concept_funds.json")
     
     elif '--industry' in args:
         data = api.get_industry_funds()
         print(format_output(data, 'industry'))
         with open('/tmp/industry_funds.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            json.dump(data, f, ensure_ascii=False, indent=2, default=to_jsonable)
         print("\n✅ 已保存到 /tmp/industry_funds.json")
     
     elif '--stock' in args:
         data = api.get_stock_funds()
         print(format_output(data, 'stock'))
         with open('/tmp/stock_funds.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            json.dump(data, f, ensure_ascii=False, indent=2, default=to_jsonable)
         print("\n✅ 已保存到 /tmp/stock_funds.json")
     
     elif '--longhu' in args:
         data = api.get_longhu_detail()
         print(format_output(data, 'longhu_detail'))
         with open('/tmp/longhu_detail.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            json.dump(data, f, ensure_ascii=False, indent=2, default=to_jsonable)
         print("\n✅ 已保存到 /tmp/longhu_detail.json")
     
     elif '--longhu-all' in args:
@@ -313,7 +289,7 @@ def main():
         print("="*60)
         print(format_output(data['detail'], 'longhu_detail'))
         with open('/tmp/longhu_all.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            json.dump(data, f, ensure_ascii=False, indent=2, default=to_jsonable)
         print("\n✅ 已保存到 /tmp/longhu_all.json")
     
     elif '--all' in args:
@@ -327,7 +303,7 @@ def main():
         print("\n" + "="*60)
         print(format_output(data['longhu']['detail'], 'longhu_detail'))
         with open('/tmp/all_funds.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            json.dump(data, f, ensure_ascii=False, indent=2, default=to_jsonable)
         print("\n✅ 已保存到 /tmp/all_funds.json")
 
 
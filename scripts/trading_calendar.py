@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+A股交易日历
+
+- 交易时段: 集合竞价 9:15, 上午 9:30-11:30, 下午 13:00-15:00
+- 周末 + 交易所休市日 (trading_holidays.json)
+- 缓存有效期: 休市期间取到数据后，有效期延长到下一次开盘
+- 判断两次运行之间行情是否可能发生变化
+"""
+
+import sys
+import os
+import json
+from datetime import date, datetime, time as dtime, timedelta
+from functools import lru_cache
+from typing import Optional, Set
+
+# 🚀 使用共享模块
+shared_dir = os.path.expanduser("~/.openclaw/workspace/shared")
+sys.path.insert(0, shared_dir)
+
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+HOLIDAYS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'trading_holidays.json')
+
+# 集合竞价开始即有报价变化，缓存按此时刻失效
+PRE_OPEN = dtime(9, 15)
+MORNING_OPEN = dtime(9, 30)
+MORNING_CLOSE = dtime(11, 30)
+AFTERNOON_OPEN = dtime(13, 0)
+AFTERNOON_CLOSE = dtime(15, 0)
+# 收盘后数据仍会定稿几分钟（收盘集合竞价、盘后撮合），之后才视为不再变化
+SETTLED = dtime(15, 5)
+
+PHASE_PRE_OPEN = 'pre_open'
+PHASE_AUCTION = 'auction'
+PHASE_MORNING = 'morning'
+PHASE_LUNCH = 'lunch'
+PHASE_AFTERNOON = 'afternoon'
+PHASE_CLOSED = 'closed'
+PHASE_HOLIDAY = 'holiday'
+
+# 行情会变化的阶段
+ACTIVE_PHASES = (PHASE_AUCTION, PHASE_MORNING, PHASE_AFTERNOON)
+
+
+@lru_cache(maxsize=1)
+def _load_holidays() -> tuple:
+    """返回 (休市日集合, 已收录年份集合)"""
+    holidays: Set[date] = set()
+    years: Set[int] = set()
+    try:
+        with open(HOLIDAYS_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for year, days in data.items():
+            if not year.isdigit():
+                continue
+            years.add(int(year))
+            holidays.update(date.fromisoformat(d) for d in days)
+    except Exception as e:
+        logger.warning(f"休市日历加载失败，仅按周末判断: {e}")
+    return holidays, years
+
+
+@lru_cache(maxsize=None)
+def _warn_unknown_year(year: int):
+    logger.warning(f"休市日历未收录 {year} 年，仅按周末判断，请更新 trading_holidays.json")
+
+
+def is_trading_day(d: date) -> bool:
+    if d.weekday() >= 5:
+        return False
+    holidays, years = _load_holidays()
+    if d.year not in years:
+        _warn_unknown_year(d.year)
+    return d not in holidays
+
+
+def next_trading_day(d: date) -> date:
+    """d 之后（不含 d）的第一个交易日"""
+    d += timedelta(days=1)
+    while not is_trading_day(d):
+        d += timedelta(days=1)
+    return d
+
+
+def prev_trading_day(d: date) -> date:
+    """d 之前（不含 d）的最后一个交易日"""
+    d -= timedelta(days=1)
+    while not is_trading_day(d):
+        d -= timedelta(days=1)
+    return d
+
+
+def market_phase(now: Optional[datetime] = None) -> str:
+    now = now or datetime.now()
+    if not is_trading_day(now.date()):
+        return PHASE_HOLIDAY
+    t = now.time()
+    if t < PRE_OPEN:
+        return PHASE_PRE_OPEN
+    if t < MORNING_OPEN:
+        return PHASE_AUCTION
+    if t < MORNING_CLOSE:
+        return PHASE_MORNING
+    if t < AFTERNOON_OPEN:
+        return PHASE_LUNCH
+    if t < SETTLED:
+        return PHASE_AFTERNOON
+    return PHASE_CLOSED
+
+
+def is_market_active(now: Optional[datetime] = None) -> bool:
+    """行情是否处于变化中（集合竞价或连续交易）"""
+    return market_phase(now) in ACTIVE_PHASES
+
+
+def next_active(now: Optional[datetime] = None) -> datetime:
+    """下一次行情开始变化的时刻（交易中则返回 now）"""
+    now = now or datetime.now()
+    phase = market_phase(now)
+    if phase in ACTIVE_PHASES:
+        return now
+    if phase == PHASE_PRE_OPEN:
+        return datetime.combine(now.date(), PRE_OPEN)
+    if phase == PHASE_LUNCH:
+        return datetime.combine(now.date(), AFTERNOON_OPEN)
+    return datetime.combine(next_trading_day(now.date()), PRE_OPEN)
+
+
+def last_active(now: Optional[datetime] = None) -> datetime:
+    """最近一次行情仍在变化的时刻（交易中则返回 now）"""
+    now = now or datetime.now()
+    phase = market_phase(now)
+    if phase in ACTIVE_PHASES:
+        return now
+    if phase == PHASE_LUNCH:
+        return datetime.combine(now.date(), MORNING_CLOSE)
+    if phase == PHASE_CLOSED:
+        return datetime.combine(now.date(), SETTLED)
+    return datetime.combine(prev_trading_day(now.date()), SETTLED)
+
+
+def last_completed_trading_day(now: Optional[datetime] = None) -> date:
+    """最近一个已收盘的交易日（日线已定型）"""
+    now = now or datetime.now()
+    if market_phase(now) == PHASE_CLOSED:
+        return now.date()
+    return prev_trading_day(now.date())
+
+
+def changed_since(last_run: datetime, now: Optional[datetime] = None) -> bool:
+    """last_run 之后行情是否可能发生过变化"""
+    return last_active(now) > last_run
+
+
+def cache_ttl(base_ttl: float, now: Optional[datetime] = None) -> float:
+    """
+    缓存有效期: 交易中使用 base_ttl；休市期间延长到下一次开盘
+    """
+    now = now or datetime.now()
+    if is_market_active(now):
+        return base_ttl
+    return max(base_ttl, (next_active(now) - now).total_seconds())
+
+
+if __name__ == '__main__':
+    now = datetime.now()
+    print(f"当前时间: {now:%Y-%m-%d %H:%M}")
+    print(f"交易阶段: {market_phase(now)}")
+    print(f"下次开盘: {next_active(now):%Y-%m-%d %H:%M}")
+    print(f"最近收盘交易日: {last_completed_trading_day(now)}")
+    print(f"休市缓存有效期: {cache_ttl(300, now) / 3600:.1f} 小时")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+有界 TTL/LRU 缓存
+
+- 每个键可单独设置 TTL
+- 超出条目数或字节预算时按 LRU 淘汰
+- 线程安全，并发未命中同一个键时只回源一次 (single-flight)
+- 命中/未命中/淘汰/过期计数
+- 可选二级存储 backend (如 disk_cache.DiskCache)，内存未命中时先查 backend 再回源
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+def _pickle_size(value: Any) -> int:
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+class _Flight:
+    """进行中的回源请求，其他线程在此等待结果"""
+
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """线程安全的 TTL + LRU 缓存"""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: Optional[int] = None,
+                 default_ttl: float = 300, sizeof: Callable[[Any], int] = _pickle_size,
+                 backend=None):
+        """
+        参数:
+            max_entries: 最大条目数
+            max_bytes: 字节预算 (按 sizeof 估算)，None 表示不限制
+            default_ttl: 默认过期秒数
+            backend: 二级存储，需提供 get(key) -> (value, expires_at) | None 和 set(key, value, expires_at)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.sizeof = sizeof
+        self.backend = backend
+
+        # key -> (value, expires_at, size)
+        self._data: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.loads = 0
+        self.backend_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return self._lookup(key, time.time()) is not None
+
+    def _remove(self, key: str):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def _lookup(self, key: str, now: float) -> Optional[tuple]:
+        """调用方需持有锁。过期条目顺便删除"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def _evict(self):
+        """调用方需持有锁"""
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key = next(iter(self._data))
+            self._remove(key)
+            self.evictions += 1
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._lookup(key, time.time())
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry[0]
+
+    def _store(self, key: str, value: Any, expires_at: float):
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            self._evict()
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """写入内存，有 backend 时同时写入 backend"""
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.time() + ttl
+        self._store(key, value, expires_at)
+        if self.backend is not None:
+            self.backend.set(key, value, expires_at)
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        读取缓存，未命中时调用 loader 回源
+
+        同一个键的并发未命中只有第一个线程执行 loader，其余线程等待并共享结果；
+        loader 返回 None 不缓存，抛出的异常会传给所有等待的线程。
+        有 backend 时先查 backend，命中则按其剩余有效期放入内存
+        """
+        with self._lock:
+            entry = self._lookup(key, time.time())
+            if entry is not None:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            if self.backend is not None:
+                stored = self.backend.get(key)
+                if stored is not None:
+                    flight.value, expires_at = stored
+                    self._store(key, flight.value, expires_at)
+                    self.backend_hits += 1
+                    return flight.value
+
+            self.loads += 1
+            flight.value = loader()
+            if flight.value is not None:
+                self.set(key, flight.value, ttl)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.event.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'loads': self.loads,
+                'backend_hits': self.backend_hits,
+            }
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import circuit_breaker
+
+
+@pytest.fixture(autouse=True)
+def breakers(tmp_path, monkeypatch):
+    """每个测试使用独立的熔断器状态，不读写 DATA_DIR/breakers.json"""
+    registry = circuit_breaker.BreakerRegistry(str(tmp_path / 'breakers.json'))
+    monkeypatch.setattr(circuit_breaker, 'registry', registry)
+    return registry
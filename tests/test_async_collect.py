@@ -0,0 +1,25 @@
+import asyncio
+
+from async_collect import fetch_quotes_async
+from circuit_breaker import breaker, STATE_OPEN
+from tencent_quote import BREAKER
+
+
+class FailingHTTP:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_text(self, url, params=None, encoding=None, timeout=10):
+        self.calls += 1
+        raise ConnectionError('reset')
+
+
+def test_async_quote_failures_trip_breaker():
+    http = FailingHTTP()
+    for _ in range(3):
+        assert asyncio.run(fetch_quotes_async(http, ['600118'])) == {}
+    assert breaker(BREAKER).state == STATE_OPEN
+
+    # 熔断后不再发请求
+    assert asyncio.run(fetch_quotes_async(http, ['600118'])) == {}
+    assert http.calls == 3
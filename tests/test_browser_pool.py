@@ -0,0 +1,72 @@
+import subprocess
+
+import pytest
+
+import browser_pool
+from browser_pool import BrowserPool
+
+TABLE = 'row "1 半导体 +3.2%"'
+URL = 'https://data.10jqka.com.cn/funds/gnzjl/'
+
+
+class FakeCLI:
+    """按参数返回预设结果，记录调用"""
+
+    def __init__(self, open_json, open_plain=(0, '', '')):
+        self.results = {'open_json': open_json, 'open_plain': open_plain}
+        self.calls = []
+
+    def __call__(self, *args, timeout=None):
+        self.calls.append(args)
+        if args[0] == 'open':
+            code, out, err = self.results['open_json' if '--json' in args else 'open_plain']
+        else:
+            code, out, err = 0, TABLE, ''
+        return subprocess.CompletedProcess(args, code, out, err)
+
+    def opens(self):
+        return [c for c in self.calls if c[0] == 'open']
+
+
+@pytest.fixture
+def make_pool(tmp_path, monkeypatch):
+    def make(cli):
+        monkeypatch.setattr(browser_pool, '_cli', cli)
+        return BrowserPool(tabs_file=str(tmp_path / 'tabs.json'))
+    return make
+
+
+def test_uses_target_id(make_pool):
+    cli = FakeCLI(open_json=(0, '{"targetId": "T1"}', ''))
+    pool = make_pool(cli)
+
+    assert pool.snapshot(URL) == TABLE
+    assert cli.calls[-1] == ('snapshot', '--format', 'aria', '--target-id', 'T1')
+    assert pool.snapshot(URL) == TABLE
+    assert len(cli.opens()) == 1
+
+
+def test_missing_target_id_snapshots_opened_page(make_pool):
+    cli = FakeCLI(open_json=(0, 'opened', ''))
+    pool = make_pool(cli)
+
+    assert pool.snapshot(URL) == TABLE
+    assert cli.opens() == [('open', URL, '--json')]
+    assert pool._single_tab
+
+
+def test_open_failure_is_not_retried_without_json(make_pool):
+    cli = FakeCLI(open_json=(1, '', 'net::ERR_NAME_NOT_RESOLVED'))
+    pool = make_pool(cli)
+
+    with pytest.raises(RuntimeError):
+        pool.snapshot(URL)
+    assert cli.opens() == [('open', URL, '--json')]
+
+
+def test_plain_open_when_json_unsupported(make_pool):
+    cli = FakeCLI(open_json=(1, '', "error: unknown option '--json'"))
+    pool = make_pool(cli)
+
+    assert pool.snapshot(URL) == TABLE
+    assert cli.opens() == [('open', URL, '--json'), ('open', URL)]
@@ -0,0 +1,63 @@
+import threading
+import time
+
+from disk_cache import DiskCache, schema_namespace
+from records import Quote
+from ttl_cache import TTLCache
+
+
+def test_get_or_load_single_flight():
+    cache = TTLCache()
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return 42
+
+    def worker(results):
+        barrier.wait()
+        results.append(cache.get_or_load('k', loader, ttl=60))
+
+    results = []
+    threads = [threading.Thread(target=worker, args=(results,)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [42] * 8
+    assert len(calls) == 1
+
+
+def test_disk_cache_round_trip(tmp_path):
+    disk = DiskCache(str(tmp_path / 'cache.sqlite3'))
+    quote = Quote(code='600118', price=10.5)
+    disk.set('q', quote, time.time() + 60)
+
+    value, _ = disk.get('q')
+    assert value == quote
+    disk.close()
+
+
+def test_disk_cache_is_isolated_by_schema(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    old = DiskCache(path, namespace='old')
+    old.set('q', Quote(code='600118'), time.time() + 60)
+
+    current = DiskCache(path)
+    assert current.namespace == schema_namespace()
+    assert current.get('q') is None
+    assert old.get('q') is not None
+    old.close()
+    current.close()
+
+
+def test_schema_namespace_tracks_record_fields():
+    before = schema_namespace()
+
+    class Extra(Quote):
+        __slots__ = ('extra',)
+
+    assert schema_namespace() != before
@@ -0,0 +1,93 @@
+import pytest
+
+import market_snapshot
+import tencent_quote
+from circuit_breaker import (BreakerRegistry, CircuitOpenError, breaker, STATE_CLOSED, STATE_HALF_OPEN,
+                             STATE_OPEN, CONSECUTIVE_FAILURES)
+
+
+def fail(b):
+    with pytest.raises(RuntimeError):
+        with b.guard():
+            raise RuntimeError('down')
+
+
+def expire_cooldown(b):
+    b.opened_at -= b.cooldown + 1
+
+
+def test_trips_after_consecutive_failures():
+    b = breaker('eastmoney')
+    for _ in range(CONSECUTIVE_FAILURES):
+        fail(b)
+    assert b.state == STATE_OPEN
+    with pytest.raises(CircuitOpenError):
+        with b.guard():
+            pytest.fail('熔断时不应执行')
+
+
+def test_call_fail_counts_as_failure():
+    b = breaker('eastmoney')
+    for _ in range(CONSECUTIVE_FAILURES):
+        with b.guard() as call:
+            call.fail()
+    assert b.state == STATE_OPEN
+
+
+def test_half_open_allows_single_trial_then_recovers():
+    b = breaker('eastmoney')
+    for _ in range(CONSECUTIVE_FAILURES):
+        fail(b)
+    expire_cooldown(b)
+
+    assert b.allow()
+    assert b.state == STATE_HALF_OPEN
+    assert not b.allow()            # 试探进行中，其他调用被拒绝
+    b.record_success()
+    assert b.state == STATE_CLOSED
+    assert b.allow()
+
+
+def test_failed_trial_reopens():
+    b = breaker('eastmoney')
+    for _ in range(CONSECUTIVE_FAILURES):
+        fail(b)
+    expire_cooldown(b)
+    fail(b)
+    assert b.state == STATE_OPEN
+    assert not b.allow()
+
+
+def test_interrupted_trial_releases_slot():
+    b = breaker('eastmoney')
+    for _ in range(CONSECUTIVE_FAILURES):
+        fail(b)
+    expire_cooldown(b)
+    with pytest.raises(KeyboardInterrupt):
+        with b.guard():
+            raise KeyboardInterrupt
+    assert b.state == STATE_HALF_OPEN
+    with b.guard():
+        pass
+    assert b.state == STATE_CLOSED
+
+
+def test_state_persists_across_runs(tmp_path):
+    path = str(tmp_path / 'state.json')
+    registry = BreakerRegistry(path)
+    b = registry.get('minimax')
+    for _ in range(CONSECUTIVE_FAILURES):
+        fail(b)
+    assert BreakerRegistry(path).get('minimax').state == STATE_OPEN
+
+
+def test_snapshot_failures_do_not_open_watchlist_breaker(monkeypatch):
+    def down(*args, **kwargs):
+        raise ConnectionError('reset')
+
+    monkeypatch.setattr(tencent_quote.http_pool, 'get', down)
+    monkeypatch.setattr(market_snapshot, 'load_universe', lambda: [['600118', '中国卫星']])
+    for _ in range(CONSECUTIVE_FAILURES):
+        assert market_snapshot.get_market_snapshot() is None
+    assert breaker(market_snapshot.SNAPSHOT_BREAKER).state == STATE_OPEN
+    assert breaker(tencent_quote.BREAKER).state == STATE_CLOSED
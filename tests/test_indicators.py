@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from indicators import IndicatorState, calc_stock_indicators, calc_indicators, closes_matrix
+
+
+def random_closes(n, seed):
+    rng = np.random.default_rng(seed)
+    return list(10 * np.cumprod(1 + rng.normal(0, 0.02, n)))
+
+
+def assert_same(incremental, batch):
+    assert incremental.keys() == batch.keys()
+    for key, value in batch.items():
+        if key == 'trend':
+            assert incremental[key] == value
+        else:
+            assert incremental[key] == pytest.approx(value, rel=1e-9, abs=1e-9), key
+
+
+@pytest.mark.parametrize('length', [3, 6, 10, 15, 21, 60])
+def test_update_matches_batch(length):
+    closes = random_closes(length, length)
+    state = IndicatorState.from_closes('sh600118', closes, base_date=20260106)
+    for price in (closes[-1] * 0.95, closes[-1], closes[-1] * 1.07):
+        assert_same(state.update(price), calc_stock_indicators(price, closes + [price]))
+
+
+def test_roll_then_update_matches_batch():
+    closes = random_closes(40, 1)
+    state = IndicatorState.from_closes('sh600118', closes[:30], base_date=30)
+    for day, close in enumerate(closes[30:], start=31):
+        state.roll(close, day)
+    price = closes[-1] * 1.02
+    assert_same(state.update(price), calc_stock_indicators(price, closes + [price]))
+
+
+def test_state_round_trips_through_dict():
+    closes = random_closes(30, 2)
+    state = IndicatorState.from_closes('sh600118', closes, base_date=20260106, synced_on=20260107)
+    restored = IndicatorState.from_dict(state.to_dict())
+    assert restored.update(11.0) == state.update(11.0)
+
+
+def test_batch_handles_ragged_history():
+    series = [random_closes(30, 3), random_closes(8, 4)]
+    prices = np.array([s[-1] for s in series])
+    result = calc_indicators(closes_matrix(series), prices)
+    for i, closes in enumerate(series):
+        single = calc_stock_indicators(prices[i], closes)
+        assert result['rsi'][i] == pytest.approx(single['rsi'])
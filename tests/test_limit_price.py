@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import history_store
+from history_store import HistoryStore
+from limit_price import board_of, limit_rates, limit_prices, limit_streaks, BOARD_MAIN, BOARD_CHINEXT, \
+    BOARD_STAR, BOARD_BSE
+from market_table import MarketTable
+from records import Bar, Quote
+
+
+def test_board_of():
+    codes = ['600118', '000001', '300456', '301001', '688981', '689009', '830799', '430047', '920001']
+    assert board_of(codes).tolist() == [BOARD_MAIN, BOARD_MAIN, BOARD_CHINEXT, BOARD_CHINEXT, BOARD_STAR,
+                                        BOARD_STAR, BOARD_BSE, BOARD_BSE, BOARD_BSE]
+
+
+@pytest.mark.parametrize('code, name, pre_close, up, down', [
+    ('600118', '中国卫星', 10.05, 11.06, 9.05),      # 11.055 / 9.045 四舍五入
+    ('600200', '*ST某某', 10.05, 10.55, 9.55),       # 10.5525 / 9.5475
+    ('300456', '赛微电子', 10.01, 12.01, 8.01),      # 12.012 / 8.008
+    ('300456', 'ST赛微', 10.01, 12.01, 8.01),        # 创业板 ST 仍为 20%
+    ('688981', '中芯国际', 10.05, 12.06, 8.04),      # 12.06 / 8.04
+    ('920001', '北交新股', 10.05, 13.07, 7.04),      # 13.065 / 7.035
+])
+def test_limit_prices_rounding(code, name, pre_close, up, down):
+    rates = limit_rates(board_of([code]), [name])
+    got_up, got_down = limit_prices(np.array([pre_close]), rates)
+    assert got_up[0] == pytest.approx(up, abs=1e-9)
+    assert got_down[0] == pytest.approx(down, abs=1e-9)
+
+
+def test_new_listing_has_no_limit():
+    rates = limit_rates(board_of(['600001', '688001', '300001']), ['N新股', 'C次新', '普通'])
+    assert np.isnan(rates[:2]).all()
+    assert rates[2] == pytest.approx(0.2)
+
+
+def test_streak_for_symbol_outside_watchlist(tmp_path, monkeypatch):
+    """日线库中没有的涨停股: 先拉取日线再计算，昨日涨停 + 今日涨停 = 2连板"""
+    bars = [Bar(20260105, 10.0, 10.0, 10.0, 10.0, 1.0),
+            Bar(20260106, 10.0, 10.0, 10.0, 10.0, 1.0),
+            Bar(20260107, 10.5, 11.0, 11.0, 10.5, 1.0)]
+    fetched = []
+
+    def fake_fetch(symbol, start=None, count=0):
+        fetched.append(symbol)
+        return bars if symbol == 'sh600999' else []
+
+    monkeypatch.setattr(history_store, 'fetch_daily_bars', fake_fetch)
+    store = HistoryStore(str(tmp_path))
+    table = MarketTable.from_quotes([
+        Quote(code='600999', name='某股份', price=12.10, pre_close=11.0, high=12.10, low=11.5, change=10.0, volume=1),
+        Quote(code='600000', name='浦发银行', price=10.0, pre_close=10.0, high=10.1, low=9.9, change=0.0, volume=1),
+    ])
+
+    summary = table.limit_streaks(today=20260108, store=store)
+    assert fetched == ['sh600999']
+    assert summary['max_streak'] == 2
+    assert summary['streak_leaders'] == [('某股份', 2)]
+
+    # 直接调用 (日线库已有该股) 结果一致
+    assert limit_streaks(np.array(['600999']), np.array([0.1]), today=20260108, store=store).tolist() == [2]
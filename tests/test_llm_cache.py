@@ -0,0 +1,38 @@
+import numpy as np
+
+from llm_cache import LLMCache, normalize, state_key
+from records import Quote
+
+
+def test_normalize_rounds_numbers_and_sorts_keys():
+    state = {'b': 1.04, 'a': [3012, np.float64(2.26), True, None], 'q': Quote(code='600118', price=10.512)}
+    assert normalize(state) == {
+        'a': [3000, 2.3, True, None],
+        'b': 1.0,
+        'q': {'code': '600118', 'price': 10.5},
+    }
+    assert normalize(42) == 42
+
+
+def test_state_key_is_stable_under_small_moves():
+    state = {'up_count': 3012, 'indices': [Quote(code='000001', price=3250.01, change=0.52)]}
+    jitter = {'indices': [Quote(code='000001', price=3250.04, change=0.54)], 'up_count': 3018}
+
+    assert state_key(state, 'm', 't') == state_key(jitter, 'm', 't')
+    assert state_key(state, 'm', 't') != state_key({**state, 'up_count': 3100}, 'm', 't')
+    assert state_key(state, 'm', 't') != state_key(state, 'other', 't')
+    assert state_key(state, 'm', 't') != state_key(state, 'm', 't2')
+
+
+def test_get_or_call_caches_non_empty_results():
+    cache = LLMCache()
+    calls = []
+
+    def call():
+        calls.append(1)
+        return '分析' if len(calls) > 1 else None
+
+    assert cache.get_or_call({'x': 1.0}, 'm', 't', call) is None
+    assert cache.get_or_call({'x': 1.0}, 'm', 't', call) == '分析'
+    assert cache.get_or_call({'x': 1.02}, 'm', 't', call) == '分析'
+    assert len(calls) == 2
@@ -0,0 +1,24 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_client import Completion, Endpoint, LLMClient
+
+
+def test_concurrent_calls_get_their_own_completion(monkeypatch):
+    def fake_stream(self, endpoint, payload, race, start):
+        race.claim(endpoint.name)
+        prompt = payload['messages'][0]['content']
+        return Completion(text=prompt.upper(), endpoint=endpoint.name, ttft=0.01, elapsed=0.02,
+                          tokens=payload['max_tokens'], tokens_per_s=100.0)
+
+    monkeypatch.setattr(LLMClient, '_stream', fake_stream)
+    client = LLMClient([Endpoint('a', 'http://localhost/a', 'm')])
+
+    def call(i):
+        return client.complete([{'role': 'user', 'content': f"stock{i}"}], max_tokens=i + 1)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(call, range(32)))
+
+    assert [r.text for r in results] == [f"STOCK{i}" for i in range(32)]
+    assert [r.tokens for r in results] == [i + 1 for i in range(32)]
+    assert not hasattr(client, 'last')
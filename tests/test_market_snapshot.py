@@ -0,0 +1,30 @@
+import pytest
+
+import market_snapshot
+from records import Quote
+
+UNIVERSE = [[f"{600000 + i}", f"股票{i}"] for i in range(10)]
+
+
+@pytest.fixture
+def snapshot_with(monkeypatch):
+    def setup(count):
+        quotes = {code: Quote(code=code, name=name, price=10.5, pre_close=10.0, change=5.0, high=10.5, low=10.0,
+                              volume=1000)
+                  for code, name in UNIVERSE[:count]}
+        monkeypatch.setattr(market_snapshot, 'load_universe', lambda: UNIVERSE)
+        monkeypatch.setattr(market_snapshot, 'fetch_quotes', lambda codes, **kwargs: quotes)
+        monkeypatch.setattr(market_snapshot.MarketTable, 'limit_streaks', lambda self: {})
+        return market_snapshot.get_market_snapshot()
+    return setup
+
+
+def test_partial_snapshot_is_rejected(snapshot_with):
+    assert snapshot_with(8) is None
+    assert snapshot_with(0) is None
+
+
+def test_snapshot_reports_coverage(snapshot_with):
+    snapshot = snapshot_with(9)
+    assert snapshot['coverage'] == pytest.approx(0.9)
+    assert snapshot['up_count'] == 9
@@ -0,0 +1,90 @@
+import time
+
+import pytest
+import requests
+
+import full_report_v3
+from outbox import Outbox, drain, STATUS_FAILED, STATUS_PENDING
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    box = Outbox(str(tmp_path / 'outbox.sqlite3'), lease=0.1)
+    yield box
+    box.close()
+
+
+def _status(outbox, message_id):
+    return {r['id']: r for r in outbox.receipts(100)}[message_id]
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+def test_enqueue_is_idempotent_per_channel(outbox):
+    assert outbox.enqueue('telegram', 'report', 'k') is not None
+    assert outbox.enqueue('telegram', 'report', 'k') is None
+    assert outbox.enqueue('whatsapp', 'report', 'k') is not None
+
+
+def test_claimed_message_is_leased(outbox, tmp_path):
+    message_id = outbox.enqueue('telegram', 'report', 'k')
+    other = Outbox(str(tmp_path / 'outbox.sqlite3'))
+
+    message = outbox.claim('telegram')
+    assert message.id == message_id
+    assert other.claim('telegram') is None
+
+    # 租约到期后 (进程中途退出) 可被其他 drain 接手
+    time.sleep(0.15)
+    assert other.claim('telegram').id == message_id
+    other.close()
+
+
+def test_drain_sends_each_message_once(outbox):
+    outbox.enqueue('telegram', 'a', 'a')
+    outbox.enqueue('telegram', 'b', 'b')
+    sent = []
+
+    results = drain(outbox, {'telegram': lambda body: sent.append(body) or {'ok': True}})
+    assert results == {'telegram': {'sent': 2, 'failed': 0}}
+    assert sent == ['a', 'b']
+    assert drain(outbox, {'telegram': sent.append}) == {}
+
+
+def test_client_error_fails_without_retry(outbox):
+    message_id = outbox.enqueue('telegram', 'report', 'k')
+    calls = []
+
+    def send(body):
+        calls.append(body)
+        raise _http_error(400)
+
+    drain(outbox, {'telegram': send}, deadline=5)
+    assert len(calls) == 1
+    assert _status(outbox, message_id)['status'] == STATUS_FAILED
+
+
+def test_rate_limit_is_retried(outbox):
+    message_id = outbox.enqueue('telegram', 'report', 'k')
+
+    def send(body):
+        raise _http_error(429)
+
+    drain(outbox, {'telegram': send}, deadline=0.5)
+    row = _status(outbox, message_id)
+    assert row['status'] == STATUS_PENDING
+    assert row['attempts'] == 1
+
+
+def test_report_key_ignores_generation_time():
+    morning = "**2026-01-08 10:00**\n持仓强势\n*更新时间: 2026-01-08 10:00:01*"
+    rerun = "**2026-01-08 10:20**\n持仓强势\n*更新时间: 2026-01-08 10:20:45*"
+    changed = "**2026-01-08 15:01**\n持仓回调\n*更新时间: 2026-01-08 15:01:59*"
+
+    assert full_report_v3.report_key(morning, '20260108') == full_report_v3.report_key(rerun, '20260108')
+    assert full_report_v3.report_key(morning, '20260108') != full_report_v3.report_key(changed, '20260108')
+    assert full_report_v3.report_key(morning, '20260108') != full_report_v3.report_key(morning, '20260109')
@@ -0,0 +1,28 @@
+from prompt_builder import build_summary
+from records import WatchStock
+
+
+def _stock(i, change):
+    price = round(10 * (1 + change / 100), 2)
+    return WatchStock(code=f"600{i:03d}", name=f"股票{i}", price=price, pre_close=10.0, change=change,
+                      high=price, low=price, trend='震荡', prev_trend='震荡', rsi=50.0, bias5=0.0)
+
+
+def test_quiet_stocks_are_summarized_as_small_moves():
+    watchlist = [_stock(0, 5.0), _stock(1, -4.0), _stock(2, 3.0)] + [_stock(i, 0.1) for i in range(3, 8)]
+    summary = build_summary({}, [], watchlist, [], budget=10000)
+
+    assert summary.stocks == ['600000', '600001', '600002']
+    assert summary.omitted == 5
+    assert '(另有5只自选股波动较小未列出，平均+0.10%)' in summary.text
+    assert '因长度省略' not in summary.text
+
+
+def test_budget_cut_is_reported_as_truncated():
+    watchlist = [_stock(i, 3.0 + i * 0.1) for i in range(20)]
+    summary = build_summary({}, [], watchlist, [], budget=120)
+
+    assert 3 <= len(summary.stocks) < 20
+    assert summary.omitted == 20 - len(summary.stocks)
+    assert f"(另有{summary.omitted}只自选股因长度省略" in summary.text
+    assert '波动较小' not in summary.text
@@ -0,0 +1,31 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from rate_limit import HostLimiter, HOST_RATES
+
+
+def test_snapshot_burst_does_not_wait_for_tokens():
+    """一次全市场快照 (约 90 块，16 并发) 不应因令牌桶/初始窗口排队"""
+    limiter = HostLimiter(*HOST_RATES['qt.gtimg.cn'])
+
+    def request(_):
+        with limiter.slot():
+            time.sleep(0.01)
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(request, range(95)))
+    # 16 并发、每块 10ms: 理想约 60ms
+    assert time.monotonic() - start < 0.5
+    assert limiter.stats()['successes'] == 95
+
+
+def test_window_halves_on_throttle_and_grows_on_success():
+    limiter = HostLimiter(rate=1000, burst=100, max_window=8, initial_window=8)
+    with limiter.slot() as slot:
+        slot.record(429)
+    assert limiter.window == 4
+    for _ in range(20):
+        with limiter.slot():
+            pass
+    assert 4 < limiter.window <= 8
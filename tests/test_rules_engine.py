@@ -0,0 +1,146 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from market_table import MarketTable
+from records import WatchStock
+from rules_engine import RuleSet, compile_condition, load_rules, stock_frame, PORTFOLIO_COLUMNS
+
+RULES = load_rules()
+
+
+@pytest.mark.parametrize('expr', [
+    "__import__('os').system('true')",
+    "price.__class__",
+    "open('x')",
+    "change ** 2 > 1",
+    "[c for c in change]",
+    "lambda: 1",
+    "price if change > 0 else 0",
+    "unknown_column > 1",
+    "abs(x=price) > 1",
+    "trend in trend",
+    "change >",
+])
+def test_rejects_expressions_outside_whitelist(expr):
+    with pytest.raises(ValueError):
+        compile_condition(expr)
+
+
+def test_invalid_rule_fails_at_load():
+    with pytest.raises(ValueError, match='bad'):
+        RuleSet.from_specs([{'id': 'bad', 'when': 'price.real > 0'}])
+
+
+def test_group_is_first_match():
+    rules = RuleSet.from_specs([
+        {'id': 'high', 'group': 'g', 'when': 'change > 5'},
+        {'id': 'up', 'group': 'g', 'when': 'change > 0'},
+        {'id': 'rest', 'group': 'g', 'when': 'True'},
+    ])
+    hits = rules.evaluate({'change': np.array([6.0, 1.0, -1.0, np.nan])})
+    assert hits.counts() == {'high': 1, 'up': 1, 'rest': 2}
+    assert [hits.labels(i) for i in range(4)] == [['high'], ['up'], ['rest'], ['rest']]
+
+
+def _old_checklist(stock):
+    """规则引擎之前 generate_stock_checklist 的 if/elif 判断"""
+    checks = []
+    price, change = stock.price, stock.change
+    trend = stock.get('trend', '未知')
+    bias5 = stock.get('bias5', 0)
+    rsi = stock.get('rsi', 50)
+    support = stock.get('support', price * 0.95)
+    resistance = stock.get('resistance', price * 1.05)
+
+    if trend == "多头":
+        checks.append("✅ 多头排列 (MA5>MA10>MA20)")
+    elif trend == "空头":
+        checks.append("❌ 空头排列 (MA5<MA10<MA20)")
+    else:
+        checks.append("⚠️ 趋势震荡")
+    if bias5 > 5:
+        checks.append(f"⚠️ 乖离率过高 ({bias5:.1f}%，有回调风险)")
+    elif bias5 < -5:
+        checks.append(f"✅ 乖离率过低 ({bias5:.1f}%，超卖)")
+    else:
+        checks.append(f"✓ 乖离率正常 ({bias5:.1f}%)")
+    if rsi > 70:
+        checks.append(f"❌ RSI超买 ({rsi:.1f})")
+    elif rsi < 30:
+        checks.append(f"✅ RSI超卖 ({rsi:.1f})")
+    else:
+        checks.append(f"✓ RSI中性 ({rsi:.1f})")
+    if change > 7:
+        checks.append("🚀 强势上涨 (>7%)")
+    elif change < -5:
+        checks.append("📉 深度回调 (<-5%)")
+    if abs(price - support) / price < 0.02:
+        checks.append(f"💡 接近支撑位 ({support:.2f})")
+    elif abs(price - resistance) / price < 0.02:
+        checks.append(f"⚠️ 接近压力位 ({resistance:.2f})")
+    return checks
+
+
+def _old_advice(stock, flag):
+    if flag['at_limit_up']:
+        return f"🚀 **{stock.name}**: 涨停，继续持有，设置止盈位"
+    if flag['opened_up']:
+        return f"⚠️ **{stock.name}**: 盘中涨停后打开，注意冲高回落"
+    if flag['at_limit_down']:
+        return f"❌ **{stock.name}**: 跌停，考虑止损"
+    if stock.change > 5:
+        return f"📈 **{stock.name}**: 强势上涨，可持有观察"
+    if stock.change > 0:
+        return f"✓ **{stock.name}**: 小幅上涨，正常持仓"
+    if stock.change > -3:
+        return f"⚠️ **{stock.name}**: 小幅回调，关注支撑"
+    return f"❌ **{stock.name}**: 深度回调，考虑止损"
+
+
+def _watchlist():
+    stocks = []
+    grid = itertools.product(
+        [10.0, -10.0, 8.0, 5.5, 2.0, 0.0, -2.0, -4.0, -6.0],
+        ['多头', '空头', '震荡', None],
+        [None, 20.0, 50.0, 80.0],
+        [None, -6.0, 0.0, 6.0],
+        [None, 'support', 'resistance'],
+    )
+    for i, (change, trend, rsi, bias5, level) in enumerate(grid):
+        pre_close = 10.0
+        price = round(pre_close * (1 + change / 100), 2)
+        high = max(price, 11.0) if i % 5 == 0 else price
+        stocks.append(WatchStock(
+            code=f"600{i % 1000:03d}", name=f"股票{i}", price=price, pre_close=pre_close, change=change,
+            high=high, low=price, limit_up=11.0, limit_down=9.0, trend=trend, rsi=rsi, bias5=bias5,
+            support=price * 0.99 if level == 'support' else None,
+            resistance=price * 1.01 if level == 'resistance' else None,
+        ))
+    return stocks
+
+
+def test_checklist_matches_old_thresholds():
+    stocks = _watchlist()
+    hits = RULES['checklist'].evaluate(stock_frame(MarketTable.from_quotes(stocks), stocks))
+    for i, stock in enumerate(stocks):
+        assert hits.messages(i) == _old_checklist(stock), stock
+
+
+def test_advice_matches_old_thresholds():
+    stocks = _watchlist()
+    table = MarketTable.from_quotes(stocks)
+    hits = RULES['advice'].evaluate(stock_frame(table, stocks))
+    for i, (stock, flag) in enumerate(zip(stocks, table.flags())):
+        assert hits.messages(i, name=stock.name) == [_old_advice(stock, flag)], stock
+
+
+@pytest.mark.parametrize('avg_idx_change, trend', [
+    (1.0, '强势上涨'), (0.5, '小幅上涨'), (0.1, '小幅上涨'), (0.0, '震荡调整'),
+    (-0.5, '震荡调整'), (-1.0, '震荡调整'), (-1.5, '深度回调'),
+])
+def test_index_trend_matches_old_thresholds(avg_idx_change, trend):
+    frame = {name: np.array([0.0]) for name in PORTFOLIO_COLUMNS}
+    frame['avg_idx_change'] = np.array([avg_idx_change])
+    assert RULES['portfolio'].evaluate(frame).labels(0, 'index_trend') == [trend]
@@ -0,0 +1,65 @@
+import pytest
+
+import hedged_quote
+from limit_price import board_of, BOARD_BSE
+from tencent_quote import to_symbol, parse_quote_fields
+
+
+@pytest.mark.parametrize('code, symbol', [
+    ('600118', 'sh600118'),
+    ('900901', 'sh900901'),
+    ('000001', 'sz000001'),
+    ('300456', 'sz300456'),
+    ('688981', 'sh688981'),
+    ('830799', 'bj830799'),
+    ('430047', 'bj430047'),
+    ('920001', 'bj920001'),
+    ('sz000001', 'sz000001'),
+    (' BJ920001 ', 'bj920001'),
+])
+def test_to_symbol(code, symbol):
+    assert to_symbol(code) == symbol
+
+
+def test_bse_codes_agree_with_board_of():
+    codes = ['920001', '920118', '830799', '430047']
+    assert all(to_symbol(c).startswith('bj') for c in codes)
+    assert set(board_of(codes)) == {BOARD_BSE}
+
+
+def test_eastmoney_secid_for_bse(monkeypatch):
+    requested = {}
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {'data': None}
+
+    def fake_get(url, params=None, timeout=None):
+        requested.update(params)
+        return Response()
+
+    monkeypatch.setattr(hedged_quote.http_pool, 'get', fake_get)
+    assert hedged_quote.fetch_quote_eastmoney('920001') is None
+    assert requested['secid'] == '0.920001'
+
+
+def test_eastmoney_market_cap_is_float_cap(monkeypatch):
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {'data': {'f43': 10.5, 'f57': '600118', 'f58': '中国卫星',
+                             'f116': 400e8, 'f117': 350e8}}
+
+    monkeypatch.setattr(hedged_quote.http_pool, 'get', lambda url, params=None, timeout=None: Response())
+    quote = hedged_quote.fetch_quote_eastmoney('600118')
+    assert 'f117' in hedged_quote.EASTMONEY_FIELDS
+    assert quote.market_cap == pytest.approx(350)
+
+
+def test_parse_quote_fields_rejects_short_rows():
+    assert parse_quote_fields(['1', '浦发银行', '600000']) is None
@@ -0,0 +1,89 @@
+import random
+import re
+
+import tonghua_shun_api
+from tonghua_shun_api import TonghuaShunDataAPI, STOCK_NET_PAGES
+from ttl_cache import TTLCache
+
+PAGE_SIZE = 50
+_SORT_RE = re.compile(r'field/(\w+)/order/(\w+)/page/(\d+)/')
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.encoding = None
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSite:
+    """个股资金表格: 按 URL 中的排序字段分页；honor_sort=False 时忽略排序字段 (始终按涨跌幅)"""
+
+    def __init__(self, stocks, honor_sort=True):
+        self.stocks = stocks
+        self.honor_sort = honor_sort
+        self.calls = []
+
+    def page_count(self):
+        return -(-len(self.stocks) // PAGE_SIZE)
+
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        match = _SORT_RE.search(url)
+        field, order, page = match.groups() if match else ('zdf', 'desc', '1')
+        if field != 'zjjlr' or not self.honor_sort:
+            field, order = 'zdf', 'desc'
+        key = 'net' if field == 'zjjlr' else 'change'
+        rows = sorted(self.stocks, key=lambda s: s[key], reverse=order == 'desc')
+        start = (int(page) - 1) * PAGE_SIZE
+        body = ''.join(
+            f"<tr><td>{start + i + 1}</td><td>{s['code']}</td><td>股票{s['code']}</td><td>10.00</td>"
+            f"<td>{s['change']:.2f}%</td><td>1.00%</td><td>1.00亿</td><td>1.00亿</td>"
+            f"<td>{s['net']:.2f}万</td><td>2.00亿</td></tr>"
+            for i, s in enumerate(rows[start:start + PAGE_SIZE]))
+        return FakeResponse(f'<table>{body}</table><span class="page_info">{page}/{self.page_count()}</span>')
+
+
+def _stocks(n=1000):
+    rng = random.Random(7)
+    stocks = [{'code': f"{600000 + i}", 'change': round(rng.uniform(-5, 5), 2),
+               'net': round(rng.uniform(-5000, 5000), 2)} for i in range(n)]
+    # 净额两端的个股涨跌幅都不大，按涨跌幅排序时在很靠后的页
+    stocks[10].update(change=0.01, net=90000.0)
+    stocks[20].update(change=-0.01, net=-80000.0)
+    return stocks
+
+
+def test_stock_funds_crawls_both_ends_of_net_ranking(monkeypatch):
+    site = FakeSite(_stocks())
+    monkeypatch.setattr(tonghua_shun_api.http_pool, 'get', site.get)
+    data = TonghuaShunDataAPI(cache=TTLCache()).get_stock_funds(limit=10)
+
+    assert data['top_net_inflow'][0].code == '600010'
+    assert data['top_net_outflow'][0].code == '600020'
+    assert len(site.calls) == 2 * STOCK_NET_PAGES
+    assert all(kwargs['headers'] == TonghuaShunDataAPI.HEADERS for _, kwargs in site.calls)
+
+
+def test_stock_funds_falls_back_to_all_pages_when_sort_is_ignored(monkeypatch):
+    site = FakeSite(_stocks(), honor_sort=False)
+    monkeypatch.setattr(tonghua_shun_api.http_pool, 'get', site.get)
+    data = TonghuaShunDataAPI(cache=TTLCache()).get_stock_funds(limit=10)
+
+    assert data['total_items'] == 1000
+    assert data['top_net_inflow'][0].code == '600010'
+    assert data['top_net_outflow'][0].code == '600020'
+
+
+def test_concept_table_fetches_all_pages(monkeypatch):
+    calls = []
+
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        return FakeResponse('<span class="page_info">1/7</span>')
+
+    monkeypatch.setattr(tonghua_shun_api.http_pool, 'get', fake_get)
+    TonghuaShunDataAPI(cache=TTLCache())._fetch_all_pages('concept')
+    assert len(calls) == 7